@@ -6,6 +6,7 @@ Handles loading, caching, and serving of μ-law audio files (pre-converted for T
 
 import os
 import json
+import time
 from flask import Response
 from config import Config
 
@@ -17,7 +18,11 @@ class AudioManager:
         self.audio_snippets = self._load_audio_snippets()
         self.cached_files = set()
         self.memory_cache = {}  # 🚀 IN-MEMORY μ-LAW FILE CACHE
+        self.valid_files = frozenset()  # Immutable snapshot of cached filenames for lock-free chain validation
+        self.has_files = False  # True once at least one file is cached (for health checks)
         self._cache_loaded = False  # Prevent double loading
+        self._files_listing = None  # Short-lived list_all_files() result shared by debug page refreshes
+        self._files_listing_time = 0.0
     
     def _load_audio_snippets(self):
         """Load audio snippets configuration from JSON file"""
@@ -89,7 +94,9 @@ class AudioManager:
         if missing_count > 0:
             print(f"⚠️ {missing_count} μ-law files missing")
         
-        # Mark as loaded to prevent double loading
+        # Publish the validation snapshot, then mark as loaded to prevent double loading
+        self.valid_files = frozenset(self.memory_cache)
+        self.has_files = bool(self.memory_cache)
         self._cache_loaded = True
     
     def get_audio_library_for_prompt(self):
@@ -143,23 +150,24 @@ class AudioManager:
             print(f"❌ μ-law file not in memory cache: {filename}")
             return Response("μ-law file not found in cache", status=404)
     
-    def validate_audio_chain(self, audio_chain):
-        """Validate that all PCM files in an audio chain exist in memory cache"""
+    def parse_audio_chain(self, audio_chain):
+        """Split an audio chain ("a.mp3 + b.mp3") into filenames, or None if any file is missing"""
         if not audio_chain:
-            return False
+            return None
         
+        valid_files = self.valid_files
         files = [f.strip() for f in audio_chain.split('+')]
-        missing_files = []
-        
-        for filename in files:
-            if filename not in self.memory_cache:
-                missing_files.append(filename)
+        missing_files = [filename for filename in files if filename not in valid_files]
         
         if missing_files:
             print(f"⚠️ Missing PCM files in chain: {missing_files}")
-            return False
+            return None
         
-        return True
+        return files
+    
+    def validate_audio_chain(self, audio_chain):
+        """Validate that all PCM files in an audio chain exist in memory cache"""
+        return self.parse_audio_chain(audio_chain) is not None
     
     def get_file_info(self, filename):
         """Get transcript and category info for a file"""
@@ -199,6 +207,8 @@ class AudioManager:
         file_count = len(self.memory_cache)
         
         self.memory_cache.clear()
+        self.valid_files = frozenset()
+        self.has_files = False
         
         print(f"🗑️ PCM memory cache cleared: {file_count} files, {cache_size_mb:.1f}MB freed")
     
@@ -212,6 +222,7 @@ class AudioManager:
             self.audio_snippets[category] = {}
         
         self.audio_snippets[category][filename] = transcript
+        self._files_listing = None  # Library changed - rebuild the listing on next request
         
         # Save updated library
         with open('audio_snippets.json', 'w', encoding='utf-8') as f:
@@ -226,14 +237,20 @@ class AudioManager:
                     pcm_data = f.read()
                 self.memory_cache[filename] = pcm_data  # Use MP3 name as key
                 self.cached_files.add(filename)
+                self.valid_files = self.valid_files | {filename}
+                self.has_files = True
                 print(f"➕ Added and cached PCM: {filename} ({len(pcm_data) // 1024}KB)")
             except Exception as e:
                 print(f"➕ Added to library but failed to cache PCM: {filename} - {e}")
         else:
             print(f"➕ Added to library: {filename} (PCM file not found for caching)")
     
-    def list_all_files(self):
-        """List all PCM audio files with their memory cache status"""
+    def list_all_files(self, max_age=5.0):
+        """List all PCM audio files with their memory cache status (reused for max_age seconds)"""
+        now = time.monotonic()
+        if self._files_listing is not None and now - self._files_listing_time < max_age:
+            return self._files_listing
+        
         all_files = []
         
         for category, files in self.audio_snippets.items():
@@ -255,7 +272,9 @@ class AudioManager:
                 
                 all_files.append(file_info)
         
-        return sorted(all_files, key=lambda x: x['filename'])
+        self._files_listing = sorted(all_files, key=lambda x: x['filename'])
+        self._files_listing_time = now
+        return self._files_listing
     
     def reload_library(self):
         """Reload audio snippets and refresh PCM memory cache"""
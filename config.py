@@ -5,6 +5,7 @@ Centralized configuration management for all API keys, constants, and settings
 """
 
 import os
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -213,6 +214,13 @@ class Config:
     
     # Session Settings
     SILENCE_THRESHOLD = 0.4  # seconds before considering speech complete
+    HISTORY_MAX = 512  # conversation history entries kept per call (oldest are dropped)
+    
+    # Logging Settings (use WARNING in production to skip per-turn call logs)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_TWIML = os.getenv('LOG_TWIML', 'false').lower() == 'true'  # Dump generated TwiML at DEBUG level
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'  # Per-request cProfile dumps (development only)
+    JSONL_EXPORT = os.getenv('JSONL_EXPORT', 'false').lower() == 'true'  # Also write session exports as JSON lines (for analytics tools)
     
     # Flask Settings
     FLASK_HOST = '0.0.0.0'
@@ -223,13 +231,20 @@ class Config:
     AUDIO_FOLDER = "audio_ulaw/"
     LOGS_FOLDER = "logs/"
     TEMP_FOLDER = "temp/"
+    PROFILES_FOLDER = "logs/profiles/"
     
     # Call Campaign Settings
     MAX_CONCURRENT_CALLS = 50
+    DEEPGRAM_SETUP_WORKERS = min(32, MAX_CONCURRENT_CALLS * 2)  # Shared Deepgram connection setup pool
     CALL_INTERVAL = 10  # seconds between outbound calls
+    CAMPAIGN_CONCURRENCY = 5  # outbound dials allowed to start per CALL_INTERVAL window (token bucket + worker count)
+    MAX_CAMPAIGN_WORKERS = 4  # campaigns allowed to queue leads at once (extra requests get HTTP 429)
+    MAX_QUEUED_LEADS = 1000  # leads buffered ahead of the dialers (producers wait when full)
+    REDIS_URL = os.getenv('REDIS_URL')  # Optional - shares the "called today" check across workers/replicas
+    LEAD_DEDUP_TTL = 86400  # seconds a dialled number is skipped by later campaigns
     
-    # Session Memory Flags Template for Plumbing Business Context
-    SESSION_FLAGS_TEMPLATE = {
+    # Session Memory Flags Template for Plumbing Business Context (read-only - sessions copy it)
+    SESSION_FLAGS_TEMPLATE = MappingProxyType({
         "intro_played": False,
         "services_explained": False, 
         "pricing_discussed": False,
@@ -239,10 +254,10 @@ class Config:
         "contact_details_collected": False,
         "booking_confirmed": False,
         "experience_mentioned": False
-    }
+    })
     
-    # Dynamic Session Variables Template for Plumbing Business
-    SESSION_VARIABLES_TEMPLATE = {
+    # Dynamic Session Variables Template for Plumbing Business (read-only - sessions copy it)
+    SESSION_VARIABLES_TEMPLATE = MappingProxyType({
         "service_type": None,  # "blocked_drain", "leaking_tap", "toilet_repair", "hot_water", "emergency", "gas_fitting"
         "urgency_level": None,  # "emergency", "urgent", "routine", "flexible"
         "property_type": None,  # "residential", "commercial", "unit", "house"
@@ -254,7 +269,7 @@ class Config:
         "issue_description": None,  # Brief description of the plumbing issue
         "previous_customer": None,  # "yes", "no" - for repeat customer handling
         "selected_appointment": None  # Final booked appointment slot
-    }
+    })
     
     # Manual Availability Data for August 2024 (Pete's Plumbing Schedule)
     AVAILABLE_DATES = [
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+KLARIQO GUNICORN CONFIGURATION
+Production server settings - run with: gunicorn main:app
+"""
+
+import os
+import threading
+
+# One worker process: call sessions, the campaign event loop and the μ-law cache
+# all live in process memory, and a call's webhooks + WebSocket must reach the same process
+workers = 1
+
+# Threaded worker - every live call holds one thread for its Media Stream WebSocket,
+# plus short-lived threads for webhooks and debug pages
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "128"))
+
+bind = f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', '5000')}"
+
+# Media Streams stay open for the whole call - don't let gunicorn kill quiet workers mid-call
+timeout = 0
+graceful_timeout = 30
+keepalive = 75
+
+def post_worker_init(worker):
+    """Start the hourly temp file cleanup that main.py's __main__ block runs under the dev server"""
+    from main import cleanup_temp_files
+    threading.Thread(target=cleanup_temp_files, name="temp-cleanup", daemon=True).start()
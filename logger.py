@@ -5,11 +5,47 @@ Handles structured logging of all call data to CSV
 """
 
 import os
+import sys
 import csv
 import time
+import queue
+import atexit
+import threading
+import logging
+import logging.handlers
 from datetime import datetime
 from config import Config
 
+_log_listener = None
+
+def setup_logging(level=None):
+    """
+    Route all application logging through a background queue listener
+
+    Handlers on the call path only format and enqueue records (QueueHandler
+    formats in the calling thread); the stdout write happens on the listener
+    thread.
+
+    Args:
+        level (str): Root log level name (defaults to Config.LOG_LEVEL)
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    
+    log_queue = queue.SimpleQueue()
+    
+    stream_handler = logging.StreamHandler(sys.stdout)  # Same stream as the remaining print() output
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level or Config.LOG_LEVEL)
+    
+    _log_listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
 class CallLogger:
     """Manages structured logging of call data"""
     
@@ -18,6 +54,14 @@ class CallLogger:
         self.call_log_file = os.path.join(self.logs_folder, "call_logs.csv")
         self.conversation_log_file = os.path.join(self.logs_folder, "conversation_logs.csv")
         
+        # Recent get_call_stats() results - days -> (computed_at, stats), cleared when a call is logged
+        self._stats_cache = {}
+        
+        # Append handles kept open for the logger's lifetime - path -> (file, csv writer, inode)
+        self._appenders = {}
+        self._append_lock = threading.Lock()
+        atexit.register(self.close)
+        
         # Ensure logs folder exists
         os.makedirs(self.logs_folder, exist_ok=True)
         
@@ -54,14 +98,15 @@ class CallLogger:
     
     def log_call_start(self, call_sid, phone_number, call_direction, lead_data=None):
         """Log the start of a new call"""
-        timestamp = datetime.now().isoformat()
+        now = datetime.now()
+        timestamp = now.isoformat()
         
         # Store call start info (we'll update with end info later)
         call_data = {
             'call_sid': call_sid,
             'phone_number': phone_number,
             'call_direction': call_direction,
-            'start_time': time.time(),
+            'start_time': now.timestamp(),
             'start_timestamp': timestamp,
             'lead_data': lead_data or {},
             'audio_files_used': [],
@@ -100,6 +145,35 @@ class CallLogger:
             
             print(f"📝 Updated customer details for {call_sid}: {customer_details}")
     
+    def _append_row(self, path, row):
+        """Append one CSV row through a long-lived handle (serialised, flushed so readers see it)"""
+        with self._append_lock:
+            appender = self._appenders.get(path)
+            
+            # Reopen if the file was deleted or rotated - the cached handle points at the old inode
+            if appender is not None:
+                try:
+                    current_inode = os.stat(path).st_ino
+                except FileNotFoundError:
+                    current_inode = None
+                if current_inode != appender[2]:
+                    appender[0].close()
+                    appender = None
+            
+            if appender is None:
+                f = open(path, 'a', newline='', encoding='utf-8')
+                appender = self._appenders[path] = (f, csv.writer(f), os.fstat(f.fileno()).st_ino)
+            f, writer, _ = appender
+            writer.writerow(row)
+            f.flush()
+    
+    def close(self):
+        """Close the long-lived log file handles (registered with atexit)"""
+        with self._append_lock:
+            for f, _, _ in self._appenders.values():
+                f.close()
+            self._appenders.clear()
+    
     def log_conversation_turn(self, call_sid, speaker, message_type, content, 
                             audio_files_used=None, response_time_ms=None):
         """
@@ -124,12 +198,10 @@ class CallLogger:
                 audio_files_str = str(audio_files_used)
         
         # Write to conversation log
-        with open(self.conversation_log_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                timestamp, call_sid, speaker, message_type,
-                content, audio_files_str, response_time_ms or ""
-            ])
+        self._append_row(self.conversation_log_file, [
+            timestamp, call_sid, speaker, message_type,
+            content, audio_files_str, response_time_ms or ""
+        ])
         
         # Update active call tracking
         if hasattr(self, '_active_calls') and call_sid in self._active_calls:
@@ -150,14 +222,15 @@ class CallLogger:
             return
         
         call_data = self._active_calls[call_sid]
-        timestamp = datetime.now().isoformat()
+        now = datetime.now()
+        timestamp = now.isoformat()
         
         # Update customer details if provided
         if session_variables:
             self.update_customer_details(call_sid, session_variables)
         
         # Calculate call duration
-        call_duration = int(time.time() - call_data['start_time'])
+        call_duration = int(now.timestamp() - call_data['start_time'])
         
         # Count unique audio files used
         unique_audio_files = len(set(call_data['audio_files_used']))
@@ -191,18 +264,19 @@ class CallLogger:
         }
         
         # Write to call log
-        with open(self.call_log_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                timestamp, call_sid, call_data['phone_number'], 
-                call_data['call_direction'], call_duration,
-                unique_audio_files, call_data['tts_responses'],
-                str(call_summary), lead_data_str, final_status
-            ])
+        self._append_row(self.call_log_file, [
+            timestamp, call_sid, call_data['phone_number'], 
+            call_data['call_direction'], call_duration,
+            unique_audio_files, call_data['tts_responses'],
+            str(call_summary), lead_data_str, final_status
+        ])
         
         # Also write to detailed customer data file
         self._write_customer_data(call_summary)
         
+        # Call log changed - recompute stats on next request
+        self._stats_cache.clear()
+        
         # Clean up from memory
         del self._active_calls[call_sid]
         
@@ -233,8 +307,18 @@ class CallLogger:
             response_time_ms=response_time_ms
         )
     
-    def get_call_stats(self, days=7):
-        """Get call statistics for the last N days"""
+    def get_call_stats(self, days=7, max_age=30):
+        """Get call statistics for the last N days (cached for max_age seconds or until the next logged call)"""
+        cached = self._stats_cache.get(days)
+        if cached is not None and time.monotonic() - cached[0] < max_age:
+            return dict(cached[1])
+        
+        stats = self._compute_call_stats(days)
+        self._stats_cache[days] = (time.monotonic(), stats)
+        return dict(stats)
+    
+    def _compute_call_stats(self, days):
+        """Scan the call log CSV and aggregate statistics for the last N days"""
         if not os.path.exists(self.call_log_file):
             return {}
         
@@ -340,27 +424,25 @@ class CallLogger:
         start_dt = datetime.fromisoformat(call_summary['start_time'].replace('Z', '+00:00'))
         
         # Write customer data
-        with open(customer_data_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                start_dt.strftime('%Y-%m-%d'),  # call_date
-                start_dt.strftime('%H:%M:%S'),  # call_time
-                call_summary['call_sid'],
-                call_summary['customer_name'] or '',
-                call_summary['phone_number'],
-                call_summary['customer_location'] or '',
-                call_summary['service_type'] or '',
-                call_summary['urgency_level'] or '',
-                call_summary['issue_description'] or '',
-                call_summary['preferred_date'] or '',
-                call_summary['preferred_time'] or '',
-                call_summary['property_type'] or '',
-                call_summary['previous_customer'] or '',
-                call_summary['duration_seconds'],
-                call_summary['final_status'],
-                call_summary['audio_files_used'],
-                call_summary['tts_responses']
-            ])
+        self._append_row(customer_data_file, [
+            start_dt.strftime('%Y-%m-%d'),  # call_date
+            start_dt.strftime('%H:%M:%S'),  # call_time
+            call_summary['call_sid'],
+            call_summary['customer_name'] or '',
+            call_summary['phone_number'],
+            call_summary['customer_location'] or '',
+            call_summary['service_type'] or '',
+            call_summary['urgency_level'] or '',
+            call_summary['issue_description'] or '',
+            call_summary['preferred_date'] or '',
+            call_summary['preferred_time'] or '',
+            call_summary['property_type'] or '',
+            call_summary['previous_customer'] or '',
+            call_summary['duration_seconds'],
+            call_summary['final_status'],
+            call_summary['audio_files_used'],
+            call_summary['tts_responses']
+        ])
 
 # Global call logger instance
 call_logger = CallLogger()
\ No newline at end of file
@@ -16,6 +16,8 @@ import wave
 import tempfile
 import subprocess
 import csv
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, wait
 from flask import Flask, request, send_file
 from flask_sock import Sock
 from deepgram import (
@@ -31,7 +33,7 @@ from session import session_manager
 from router import response_router
 from tts_engine import tts_engine
 from audio_manager import audio_manager
-from logger import call_logger
+from logger import call_logger, setup_logging
 from session_data_exporter import session_exporter
 
 # Import calendar integration
@@ -50,10 +52,19 @@ from routes.test import test_bp
 app = Flask(__name__)
 sock = Sock(app)
 
+# Optional per-request profiling - one cProfile dump per request (open with snakeviz/pstats)
+if Config.PROFILING_ENABLED:
+    from werkzeug.middleware.profiler import ProfilerMiddleware
+    os.makedirs(Config.PROFILES_FOLDER, exist_ok=True)
+    app.wsgi_app = ProfilerMiddleware(app.wsgi_app, profile_dir=Config.PROFILES_FOLDER)
+
 # Configure Flask logging to be less verbose
 import logging
-log = logging.getLogger('werkzeug')
-log.setLevel(logging.ERROR)
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+# Queue-backed application logging (writes happen off the call path)
+setup_logging()
+log = logging.getLogger(__name__)
 
 audio_manager.reload_library()
 
@@ -66,9 +77,19 @@ app.register_blueprint(test_bp)
 config = DeepgramClientOptions(options={"keepalive": "true"})
 deepgram_client = DeepgramClient(Config.DEEPGRAM_API_KEY, config)
 
+# Bounded pool for Deepgram connection setup (instead of a new thread per call)
+deepgram_executor = ThreadPoolExecutor(
+    max_workers=Config.DEEPGRAM_SETUP_WORKERS,
+    thread_name_prefix="deepgram-setup"
+)
+
 # Global variable for ngrok URL
 current_ngrok_url = None
 
+# μ-law → 16-bit linear PCM lookup table (one entry per possible μ-law byte)
+# Decoding a frame becomes a single NumPy gather instead of a per-byte audioop pass
+_ULAW_LUT = np.frombuffer(audioop.ulaw2lin(bytes(range(256)), 2), dtype=np.int16).copy()
+
 @app.route("/calendar-status", methods=['GET'])
 def calendar_status():
     """Calendar integration status endpoint"""
@@ -167,20 +188,20 @@ def send_audio_twilio_media_stream(ws, ulaw_data, stream_sid):
     """
     try:
         if not stream_sid:
-            print("❌ No stream_sid available")
+            log.error("❌ No stream_sid available")
             return
         
         if not ulaw_data:
-            print("❌ No μ-law data provided")
+            log.error("❌ No μ-law data provided")
             return
         
-        print(f"🎵 Sending {len(ulaw_data)} bytes of μ-law data...")
+        log.debug("🎵 Sending %d bytes of μ-law data...", len(ulaw_data))
         
         # Send μ-law data in reasonable chunks (Twilio is flexible)
         CHUNK_SIZE = 8000  # ~1 second of 8kHz μ-law audio
         total_chunks = len(ulaw_data) // CHUNK_SIZE
         
-        print(f"🎵 Sending {total_chunks} chunks of {CHUNK_SIZE} bytes each")
+        log.debug("🎵 Sending %d chunks of %d bytes each", total_chunks, CHUNK_SIZE)
         
         # Send chunks with minimal delay
         for i in range(total_chunks):
@@ -201,7 +222,7 @@ def send_audio_twilio_media_stream(ws, ulaw_data, stream_sid):
             time.sleep(0.01)  # 10ms delay between chunks
             
             if (i + 1) % 100 == 0:
-                print(f"📡 Sent {i + 1}/{total_chunks} chunks...")
+                log.debug("📡 Sent %d/%d chunks...", i + 1, total_chunks)
         
         # Send remaining bytes (no padding needed for μ-law)
         remaining_bytes = len(ulaw_data) % CHUNK_SIZE
@@ -218,14 +239,12 @@ def send_audio_twilio_media_stream(ws, ulaw_data, stream_sid):
             })
             
             ws.send(message)
-            print(f"📡 Sent final chunk")
+            log.debug("📡 Sent final chunk")
         
-        print(f"✅ μ-law audio sent successfully: {total_chunks} chunks")
+        log.debug("✅ μ-law audio sent successfully: %d chunks", total_chunks)
         
     except Exception as e:
-        print(f"❌ Send error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ Send error: %s", e)
 
 def convert_mp3_to_ulaw_for_tts(mp3_data):
     """
@@ -240,7 +259,7 @@ def convert_mp3_to_ulaw_for_tts(mp3_data):
         # Load MP3 using librosa and convert to Twilio format
         audio_data, sr = librosa.load(io.BytesIO(mp3_data), sr=8000, mono=True)
         
-        print(f"📊 TTS Audio: Converted to 8000Hz mono, {len(audio_data)} samples")
+        log.debug("📊 TTS Audio: Converted to 8000Hz mono, %d samples", len(audio_data))
         
         # Convert to 16-bit PCM first (required for audioop.lin2ulaw)
         audio_data = np.clip(audio_data, -1.0, 1.0)
@@ -249,14 +268,14 @@ def convert_mp3_to_ulaw_for_tts(mp3_data):
         # Convert 16-bit PCM to μ-law format (8-bit)
         ulaw_data = audioop.lin2ulaw(pcm_16bit.tobytes(), 2)  # 2 = 16-bit samples
         
-        print(f"✅ TTS converted to μ-law: {len(ulaw_data)} bytes")
+        log.debug("✅ TTS converted to μ-law: %d bytes", len(ulaw_data))
         return ulaw_data
         
     except ImportError:
-        print("❌ librosa not available for TTS conversion")
+        log.error("❌ librosa not available for TTS conversion")
         return None
     except Exception as e:
-        print(f"❌ TTS MP3 to μ-law conversion failed: {e}")
+        log.error("❌ TTS MP3 to μ-law conversion failed: %s", e)
         return None
 
 
@@ -265,6 +284,50 @@ def convert_mp3_to_ulaw_for_tts(mp3_data):
 
 # ===== TWILIO WEBSOCKET HANDLER =====
 
+# Control event handlers for the Twilio media stream
+# Each returns True when the stream should be closed
+
+def _on_connected(ws, session, call_sid, data):
+    """Twilio opened the media stream"""
+    log.info("🔌 Twilio connected: %s", call_sid)
+
+def _on_start(ws, session, call_sid, data):
+    """Stream metadata arrived - send the intro audio"""
+    session.stream_sid = data.get('streamSid')
+    log.info("🎤 Stream started: %s", session.stream_sid)
+    
+    # Send intro audio immediately after stream starts
+    if session.selected_intro:
+        intro_file = session.selected_intro
+        cache_key = intro_file.replace('.ulaw', '.mp3') if intro_file.endswith('.ulaw') else intro_file
+        
+        if cache_key in audio_manager.memory_cache:
+            ulaw_data = audio_manager.memory_cache[cache_key]
+            send_audio_twilio_media_stream(ws, ulaw_data, session.stream_sid)
+            call_logger.log_nisha_audio_response(call_sid, intro_file)
+            log.info("🎵 Sent intro via WebSocket: %s", intro_file)
+        else:
+            log.error("❌ Intro audio not in cache: %s", cache_key)
+
+def _on_dtmf(ws, session, call_sid, data):
+    """Caller pressed a keypad digit (not used by the conversation flow yet)"""
+    log.debug("🔢 DTMF %s on %s", data.get('dtmf', {}).get('digit'), call_sid)
+
+def _on_stop(ws, session, call_sid, data):
+    """Twilio closed the media stream"""
+    log.info("🛑 Stream stopped: %s", call_sid)
+    return True
+
+def _on_unhandled_event(ws, session, call_sid, data):
+    """Ignore events we don't act on (e.g. mark)"""
+
+_TWILIO_EVENT_HANDLERS = {
+    'connected': _on_connected,
+    'start': _on_start,
+    'dtmf': _on_dtmf,
+    'stop': _on_stop,
+}
+
 @sock.route('/media/<call_sid>')
 def media_stream(ws, call_sid):
     """Handle Twilio streaming audio"""
@@ -275,6 +338,9 @@ def media_stream(ws, call_sid):
     session.twilio_ws = ws
     session.stream_sid = None
     
+    # Signals the transcript checker (and a late Deepgram setup) that this stream has closed
+    stream_closed = threading.Event()
+    
     def start_deepgram():
         """Initialize Deepgram connection for this session"""
         try:
@@ -295,19 +361,22 @@ def media_stream(ws, call_sid):
             session.dg_connection.on(LiveTranscriptionEvents.Open, session.on_deepgram_open)
             session.dg_connection.start(options)
             
+            # Stream closed while we were queued/connecting - nobody else will finish this socket
+            if stream_closed.is_set():
+                dg_connection, session.dg_connection = session.dg_connection, None
+                if dg_connection:
+                    dg_connection.finish()
+            
         except Exception as e:
-            print(f"❌ Deepgram setup error: {e}")
+            log.error("❌ Deepgram setup error: %s", e)
     
-    # Start Deepgram in separate thread
-    deepgram_thread = threading.Thread(target=start_deepgram)
-    deepgram_thread.daemon = True
-    deepgram_thread.start()
-    time.sleep(0.5)
+    # Start Deepgram on the shared setup pool (wait up to 0.5s for it to come up)
+    session.deepgram_future = deepgram_executor.submit(start_deepgram)
+    wait([session.deepgram_future], timeout=0.5)
     
     def transcript_checker():
         """Monitor for completed transcripts"""
-        while True:
-            time.sleep(0.05)
+        while not stream_closed.wait(0.05):
             if session.check_for_completion():
                 process_and_respond_twilio_stream(session.completed_transcript, call_sid, ws, session.stream_sid)
                 session.reset_for_next_input()
@@ -325,62 +394,58 @@ def media_stream(ws, call_sid):
                 break
                 
             data = json.loads(message)
+            event_type = data.get('event')
             
-            if data.get('event') == 'connected':
-                print(f"🔌 Twilio connected: {call_sid}")
-                
-            elif data.get('event') == 'start':
-                session.stream_sid = data.get('streamSid')
-                print(f"🎤 Stream started: {session.stream_sid}")
-                
-                # Send intro audio immediately after stream starts
-                if hasattr(session, 'selected_intro') and session.selected_intro:
-                    intro_file = session.selected_intro
-                    cache_key = intro_file.replace('.ulaw', '.mp3') if intro_file.endswith('.ulaw') else intro_file
-                    
-                    if cache_key in audio_manager.memory_cache:
-                        ulaw_data = audio_manager.memory_cache[cache_key]
-                        send_audio_twilio_media_stream(ws, ulaw_data, session.stream_sid)
-                        call_logger.log_nisha_audio_response(call_sid, intro_file)
-                        print(f"🎵 Sent intro via WebSocket: {intro_file}")
-                    else:
-                        print(f"❌ Intro audio not in cache: {cache_key}")
-                
-            elif data.get('event') == 'media':
-                # Forward audio to Deepgram
+            if event_type == 'media':
+                # Forward audio to Deepgram (hot path - one event per 20ms frame)
                 if session.dg_connection:
                     media_payload = data.get('media', {}).get('payload', '')
                     if media_payload:
                         try:
                             # Convert μ-law to linear PCM for Deepgram
                             mulaw_data = base64.b64decode(media_payload)
-                            linear_data = audioop.ulaw2lin(mulaw_data, 2)
+                            linear_data = _ULAW_LUT[np.frombuffer(mulaw_data, dtype=np.uint8)].tobytes()
                             session.dg_connection.send(linear_data)
                         except Exception as e:
-                            print(f"⚠️ Audio processing error: {e}")
-                            
-            elif data.get('event') == 'stop':
-                print(f"🛑 Stream stopped: {call_sid}")
+                            log.warning("⚠️ Audio processing error: %s", e)
+                continue
+            
+            # Control events are rare - dispatch off the hot path
+            if _TWILIO_EVENT_HANDLERS.get(event_type, _on_unhandled_event)(ws, session, call_sid, data):
                 break
                 
     except Exception as e:
-        print(f"❌ WebSocket error for {call_sid}: {e}")
+        log.error("❌ WebSocket error for %s: %s", call_sid, e)
         
     finally:
+        stream_closed.set()
+        
+        # Drop a Deepgram setup that is still queued (a running one sees stream_closed and finishes itself)
+        session.deepgram_future.cancel()
+        
         # Export session data before cleanup
         try:
             if session:
                 session_exporter.export_session_data(session)
         except Exception as e:
-            print(f"⚠️ Error exporting session data: {e}")
-        
-        # Cleanup session
-        if session.dg_connection:
-            session.dg_connection.finish()
-            session.dg_connection = None
+            log.warning("⚠️ Error exporting session data: %s", e)
         
         # Remove session from manager
         session_manager.remove_session(call_sid)
+        
+        # Wait for the transcript checker, then decide - before closing Deepgram, so a setup
+        # that completes during the join still gets its connection finished below
+        checker_thread.join(timeout=1.0)
+        recyclable = not checker_thread.is_alive() and session.deepgram_future.done()
+        
+        # Cleanup session (take the connection first - a late setup may be finishing it too)
+        dg_connection, session.dg_connection = session.dg_connection, None
+        if dg_connection:
+            dg_connection.finish()
+        
+        # Hand the session object back to the pool once no other thread can still touch it
+        if recyclable:
+            session_manager.recycle_session(session)
 
 def process_and_respond_twilio_stream(transcript, call_sid, ws, stream_sid):
     """Process input and respond with bidirectional μ-law streaming"""
@@ -400,13 +465,15 @@ def process_and_respond_twilio_stream(transcript, call_sid, ws, stream_sid):
         # Calculate response time
         response_time_ms = int((time.time() - start_time) * 1000)
         
-        # Add to history
-        session.add_to_history("Parent", transcript)
-        session.add_to_history("Nisha", f"<{response_type}: {content}>")
+        # Stage response and record the turn in one session update
+        session.prepare_next_response(response_type, content, transcript, (
+            ("Parent", transcript),
+            ("Nisha", f"<{response_type}: {content}>"),
+        ))
         
         # Clean logging
-        print(f"📞 User: {transcript}")
-        print(f"🤖 AI: {content} ({response_time_ms}ms)")
+        log.info("📞 User: %s", transcript)
+        log.info("🤖 AI: %s (%dms)", content, response_time_ms)
         
         if response_type == "AUDIO":
             # Send μ-law audio files directly via WebSocket
@@ -423,7 +490,7 @@ def process_and_respond_twilio_stream(transcript, call_sid, ws, stream_sid):
                     send_audio_twilio_media_stream(ws, ulaw_data, stream_sid)
                     time.sleep(1.0)
                 else:
-                    print(f"❌ μ-law audio file not in cache: {cache_key} (original: {audio_file})")
+                    log.error("❌ μ-law audio file not in cache: %s (original: %s)", cache_key, audio_file)
                     
             call_logger.log_nisha_audio_response(call_sid, content)
             
@@ -436,16 +503,14 @@ def process_and_respond_twilio_stream(transcript, call_sid, ws, stream_sid):
                 if ulaw_data:
                     send_audio_twilio_media_stream(ws, ulaw_data, stream_sid)
                 else:
-                    print("❌ TTS MP3 to μ-law conversion failed")
+                    log.error("❌ TTS MP3 to μ-law conversion failed")
                     
             call_logger.log_nisha_tts_response(call_sid, content)
         
-        print(f"✅ Response sent")
+        log.debug("✅ Response sent")
         
     except Exception as e:
-        print(f"❌ Processing error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ Processing error: %s", e)
 
 @app.route("/audio_ulaw/<filename>")
 def serve_audio(filename):
@@ -466,7 +531,7 @@ def serve_temp_audio(filename):
             return "Invalid file type", 404
             
     except Exception as e:
-        print(f"❌ Error serving TTS audio {filename}: {e}")
+        log.error("❌ Error serving TTS audio %s: %s", filename, e)
         return "Error serving TTS audio", 500
 
 @app.route("/logs/<filename>")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+KLARIQO PROVIDER CONNECTIONS MODULE
+Process-wide keep-alive HTTP sessions for Twilio, OpenAI and ElevenLabs
+"""
+
+import base64
+import logging
+import threading
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+
+log = logging.getLogger(__name__)
+
+# Twilio REST API - base URL and auth header are identical for every request, so built once at import
+TWILIO_API = "https://api.twilio.com"
+TWILIO_AUTH_HEADER = {
+    "Authorization": "Basic " + base64.b64encode(
+        f"{Config.TWILIO_ACCOUNT_SID}:{Config.TWILIO_AUTH_TOKEN}".encode()
+    ).decode()
+}
+
+# Keep-alive session for one-off Twilio requests from request threads (e.g. /call_test)
+# Shared by all threads - size its pool so concurrent test calls reuse connections instead of discarding them
+twilio_session = requests.Session()
+twilio_session.headers.update(TWILIO_AUTH_HEADER)
+twilio_session.mount(TWILIO_API, HTTPAdapter(pool_connections=1, pool_maxsize=10))
+
+# Shared keep-alive connection pool for ElevenLabs requests
+# Reusing connections skips DNS + TCP + TLS setup on every TTS turn
+eleven_http_client = httpx.Client(
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    timeout=httpx.Timeout(30.0, connect=5.0)
+)
+
+# Shared keep-alive connection pool for OpenAI chat completions (router)
+openai_http_client = httpx.Client(
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    timeout=httpx.Timeout(30.0, connect=5.0)
+)
+
+# One cheap request per provider opens a connection and parks it in the keep-alive pool
+_WARM_UP_TARGETS = (
+    ("Twilio", lambda: twilio_session.head(TWILIO_API, timeout=5.0)),
+    ("ElevenLabs", lambda: eleven_http_client.head("https://api.elevenlabs.io/")),
+    ("OpenAI", lambda: openai_http_client.head("https://api.openai.com/")),
+)
+
+def warm_up_connections():
+    """Open a keep-alive connection to each provider so the first call skips TCP + TLS setup"""
+    for name, request_fn in _WARM_UP_TARGETS:
+        try:
+            request_fn()
+        except Exception as e:
+            log.warning("⚠️ %s connection warm-up failed: %s", name, e)
+
+def warm_up_in_background():
+    """Run warm_up_connections() on a daemon thread (never delays startup)"""
+    threading.Thread(target=warm_up_connections, name="provider-warm-up", daemon=True).start()
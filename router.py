@@ -8,9 +8,10 @@ from openai import OpenAI
 from config import Config
 from audio_manager import audio_manager
 from calendar_integration import calendar_client
+from providers import openai_http_client
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=Config.OPENAI_API_KEY)
+# Initialize OpenAI client (on the shared keep-alive pool)
+openai_client = OpenAI(api_key=Config.OPENAI_API_KEY, http_client=openai_http_client)
 
 class ResponseRouter:
     """Handles AI-powered response selection with reliable GPT processing"""
@@ -474,7 +475,7 @@ Remember: Always be helpful, professional, and ready to book appointments with a
         
         # Look through recent conversation history for audio responses
         if hasattr(session, 'conversation_history'):
-            for entry in session.conversation_history[-6:]:  # Last 6 entries
+            for entry in session.recent_history(6):  # Last 6 entries
                 if "Nisha:" in entry and "<audio:" in entry:
                     # Extract filenames from "<audio: file1.mp3 + file2.mp3>"
                     import re
@@ -499,7 +500,7 @@ Remember: Always be helpful, professional, and ready to book appointments with a
         if not hasattr(session, 'conversation_history'):
             return "None"
         
-        recent = session.conversation_history[-(limit*2):]  # Last N exchanges
+        recent = session.recent_history(limit * 2)  # Last N exchanges
         return " | ".join(recent) if recent else "None"
     
     def _build_context_prompt(self, session, user_input):
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+KLARIQO SHARED CONVERSATION ROUTES
+One continue-webhook handler shared by the inbound and outbound blueprints
+"""
+
+import re
+import logging
+from functools import lru_cache
+
+from config import Config
+from session import session_manager
+from logger import call_logger
+from audio_manager import audio_manager
+from twiml_builder import twiml_pool, twiml_response
+
+log = logging.getLogger(__name__)
+
+# Responses that end the call (covers "goodbye" text and goodbye*.mp3 audio chains)
+_END_CALL_RE = re.compile(r"goodbye", re.IGNORECASE)
+
+# Static fallback TwiML - identical for every call, so built once at import
+_FALLBACK_PROCESSING_ERROR = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<Response><Say>Processing error</Say><Hangup /></Response>'
+)
+_FALLBACK_TECHNICAL_DIFFICULTIES = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b"<Response><Say>I'm having technical difficulties.</Say><Hangup /></Response>"
+)
+
+@lru_cache(maxsize=4)
+def audio_url_prefix(base_url):
+    """Public prefix for μ-law audio URLs (one entry per public host)"""
+    return f"{base_url}/audio_ulaw/"
+
+def make_continue_handler(direction, caller_label, agent_label):
+    """
+    Build the continue-conversation view for one call direction
+
+    Args:
+        direction (str): "inbound" or "outbound" (used in log lines and the view name)
+        caller_label (str): History label for the person on the phone
+        agent_label (str): History label for the AI agent
+    """
+
+    def continue_conversation(call_sid):
+        try:
+            # Get session and its prepared response in one step
+            ready = session_manager.pop_ready(call_sid)
+            if ready is None:
+                log.warning("❌ No session or not ready: %s", call_sid)
+                return twiml_response(_FALLBACK_PROCESSING_ERROR)
+
+            session, response_type, content, transcript = ready
+
+            # Add to conversation history
+            session.add_history_entries(((caller_label, transcript), (agent_label, content)))
+
+            # Build TwiML response
+            with twiml_pool.builder() as twiml:
+                if response_type == "AUDIO":
+                    # Validate all files exist (returns the stripped filenames)
+                    audio_files = audio_manager.parse_audio_chain(content)
+                    if audio_files:
+                        prefix = audio_url_prefix(session.base_url)
+                        for audio_file in audio_files:
+                            twiml.play(prefix + audio_file)
+
+                        # Log audio response
+                        call_logger.log_nisha_audio_response(call_sid, content)
+                    else:
+                        # Fallback if files don't exist
+                        twiml.say("I'm having trouble with my audio files.")
+                        call_logger.log_nisha_tts_response(call_sid, "Audio file error - fallback")
+
+                elif response_type == "TTS":
+                    # Handle TTS response
+                    from tts_engine import tts_engine
+
+                    tts_url = tts_engine.generate_audio_url(content, session.base_url)
+                    if tts_url:
+                        twiml.play(tts_url)
+                        call_logger.log_nisha_tts_response(call_sid, content)
+                    else:
+                        twiml.say("Sorry, I'm having trouble generating audio.")
+                        call_logger.log_nisha_tts_response(call_sid, "TTS generation failed")
+
+                # Check for agent transfer request
+                transfer_requested = session.get_session_variable("transfer_requested")
+                if transfer_requested == "yes":
+                    log.info("🔄 EXECUTING AGENT TRANSFER for %s call %s", direction, call_sid)
+
+                    # Play transfer message
+                    if Config.AGENT_TRANSFER["transfer_message"]:
+                        twiml.say(Config.AGENT_TRANSFER["transfer_message"])
+
+                    # Transfer the call
+                    twiml.dial(
+                        Config.AGENT_TRANSFER["agent_number"],
+                        timeout=Config.AGENT_TRANSFER["transfer_timeout"],
+                        caller_id=Config.TWILIO_PHONE
+                    )
+
+                    # Log transfer with session variables
+                    call_logger.log_call_end(call_sid, "transferred_to_agent", session.session_variables)
+                    session_manager.remove_session(call_sid)
+
+                    return twiml_response(twiml.render())
+
+                # Check if conversation should end
+                if _END_CALL_RE.search(content):
+                    twiml.hangup()
+
+                    # Clean up session with session variables
+                    call_logger.log_call_end(call_sid, "completed", session.session_variables)
+                    session_manager.remove_session(call_sid)
+
+                else:
+                    # Reset session for next input
+                    session.reset_for_next_input()
+
+                    # Continue streaming
+                    twiml.connect_stream(session.ws_url)
+
+                return twiml_response(twiml.render())
+
+        except Exception as e:
+            log.error("❌ Error in %s continue: %s", direction, e)
+
+            # Log error and cleanup
+            call_logger.log_call_end(call_sid, "error")
+            session_manager.remove_session(call_sid)
+
+            return twiml_response(_FALLBACK_TECHNICAL_DIFFICULTIES)
+
+    continue_conversation.__name__ = f"continue_{direction}_conversation"
+    continue_conversation.__doc__ = f"Continue {direction} conversation after processing user input"
+    return continue_conversation
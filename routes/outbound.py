@@ -5,69 +5,118 @@ Handles outbound calls to potential customers for plumbing services
 """
 
 import os
-import sys
-import threading
+import asyncio
 import time
+import logging
+import threading
+import weakref
+from itertools import chain
+import httpx
+import orjson
+from aiolimiter import AsyncLimiter
 
-# Fix import path for parent directory modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Optional Redis client for cross-process lead dedup
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
 
-from flask import Blueprint, request
-from twilio.twiml.voice_response import VoiceResponse, Connect, Stream, Dial
-from twilio.rest import Client
+from flask import Blueprint, Response, request
 
 from config import Config
-from session import session_manager
+from session import session_manager, CustomerData
 from logger import call_logger
+from providers import TWILIO_API, TWILIO_AUTH_HEADER, twilio_session
+from twiml_builder import connect_stream_twiml, twiml_response
+from routes.conversation import make_continue_handler
 
 # Create blueprint for outbound routes
 outbound_bp = Blueprint('outbound', __name__)
 
-# Initialize Twilio client
-twilio_client = Client(Config.TWILIO_ACCOUNT_SID, Config.TWILIO_AUTH_TOKEN)
+log = logging.getLogger(__name__)
+
+# Twilio Calls API path - identical for every dial, so built once at import
+_TWILIO_CALLS_PATH = f"/2010-04-01/Accounts/{Config.TWILIO_ACCOUNT_SID}/Calls.json"
+
+# Pooled async HTTP client for campaign dials (one TLS connection pool per process)
+# Only used from the campaign event loop below
+_twilio_http = httpx.AsyncClient(
+    base_url=TWILIO_API,
+    headers=TWILIO_AUTH_HEADER,
+    limits=httpx.Limits(max_keepalive_connections=32),
+    timeout=httpx.Timeout(15.0, connect=5.0)
+)
+
+# Background event loop that runs outbound campaigns (started with the app)
+_campaign_loop = None
+_campaign_loop_lock = threading.Lock()
+
+# Leads waiting to be dialled - (customer, base_url) pairs, created on the campaign loop
+_lead_queue = None
+
+# Token bucket shared by all lead workers - CAMPAIGN_CONCURRENCY dials per CALL_INTERVAL window
+_dial_limiter = None
+
+# "Called today" dedup - Redis when REDIS_URL is set, else phone -> monotonic expiry for this process
+_redis = None
+_dialled_numbers = {}
+_DIALLED_PRUNE_INTERVAL = 60  # seconds between sweeps of expired local dedup entries
+_dialled_prune_at = 0.0
+
+# Running campaign counters (only mutated on the campaign loop)
+_campaign_stats = {"queued": 0, "dialled": 0, "successful": 0}
+
+# Futures of campaign producers still queueing leads (entries vanish once finished)
+_active_campaigns = weakref.WeakSet()
+_active_campaigns_lock = threading.Lock()
+
+def _get_campaign_loop():
+    """Return the shared campaign event loop, starting it and its lead workers if needed"""
+    global _campaign_loop
+    with _campaign_loop_lock:
+        if _campaign_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="campaign-loop", daemon=True).start()
+            asyncio.run_coroutine_threadsafe(_start_lead_workers(), loop).result()
+            _campaign_loop = loop
+    return _campaign_loop
 
 @outbound_bp.route("/twilio/outbound/<lead_id>", methods=['GET', 'POST'])
 def handle_outbound_call(lead_id):
     """Handle OUTBOUND calls to potential customers"""
     
-    # Extract call information (handle both GET and POST)
-    call_sid = request.form.get('CallSid') or request.args.get('CallSid', 'unknown')
-    to_number = request.form.get('To') or request.args.get('To', 'Unknown')
-    from_number = request.form.get('From') or request.args.get('From', 'Unknown')
+    # Extract call information (handle both GET and POST - form and query string in one view)
+    values = request.values
+    call_sid = values.get('CallSid', 'unknown')
+    to_number = values.get('To', 'Unknown')
+    from_number = values.get('From', 'Unknown')
     
-    print(f"🔍 DEBUG: Method={request.method}")
-    print(f"🔍 DEBUG: CallSid={call_sid}")
-    print(f"🔍 DEBUG: To={to_number}, From={from_number}")
+    log.debug("🔍 Method=%s CallSid=%s To=%s From=%s", request.method, call_sid, to_number, from_number)
     
     # Get customer data from session manager's tracked outbound calls
-    lead_data = session_manager.active_outbound_calls.get(call_sid, {})
+    tracked_call = session_manager.active_outbound_calls.get(call_sid)
+    lead_data = tracked_call['lead_data'] if tracked_call else None
     
-    # If no lead data found, create default customer data
+    # If no lead data found, use default customer data
     if not lead_data:
-        customer_data = {
-            'id': lead_id, 
-            'customer_name': 'Customer', 
-            'type': 'lead',
-            'phone': to_number,
-            'call_purpose': 'service_inquiry'
-        }
+        customer_data = CustomerData(lead_id, phone=to_number)
     else:
         # Use the actual customer data from CSV
-        customer_data = {
-            'id': lead_data.get('id', lead_id),
-            'customer_name': lead_data.get('customer_name', 'Customer'),
-            'type': lead_data.get('type', 'lead'),
-            'phone': to_number,
-            'address': lead_data.get('address', ''),
-            'service_needed': lead_data.get('service_needed', ''),
-            'notes': lead_data.get('notes', ''),
-            'call_purpose': 'service_inquiry'
-        }
+        customer_data = CustomerData(
+            lead_data.get('id', lead_id),
+            customer_name=lead_data.get('customer_name', 'Customer'),
+            type=lead_data.get('type', 'lead'),
+            phone=to_number,
+            address=lead_data.get('address', ''),
+            service_needed=lead_data.get('service_needed', ''),
+            notes=lead_data.get('notes', '')
+        )
     
-    print(f"📞 OUTBOUND call to customer: {customer_data['customer_name']}")
+    log.info("📞 OUTBOUND call to customer: %s", customer_data.customer_name)
     
     # Log call start
-    call_logger.log_call_start(call_sid, customer_data['phone'], "outbound", customer_data)
+    call_logger.log_call_start(call_sid, customer_data.phone, "outbound", customer_data)
     
     # Create OUTBOUND session
     session = session_manager.create_session(
@@ -77,194 +126,208 @@ def handle_outbound_call(lead_id):
     )
     
     # Set the customer name in session variables for GPT to use
-    if customer_data.get('customer_name') and customer_data['customer_name'] != 'Customer':
-        session.update_session_variable("customer_name", customer_data['customer_name'])
-        print(f"👤 Customer name set in session: {customer_data['customer_name']}")
-    
-    # Build TwiML response
-    response = VoiceResponse()
+    if customer_data.customer_name and customer_data.customer_name != 'Customer':
+        session.update_session_variable("customer_name", customer_data.customer_name)
+        log.debug("👤 Customer name set in session: %s", customer_data.customer_name)
     
     # Use plumbing intro for outbound calls
     selected_intro = "plumbing_intro.mp3"
-    session.session_memory["intro_played"] = True
+    session.set_flag("intro_played")
     
     # Store selected intro for WebSocket streaming
     session.selected_intro = selected_intro
     
+    # Cache callback URLs for the lifetime of the call
+    session.base_url = request.url_root.rstrip('/')
+    session.ws_url = f'wss://{request.host}/media/{call_sid}'
+    
     # Connect directly to WebSocket for bidirectional streaming  
     # Intro will be sent via WebSocket stream
-    connect = Connect()
-    stream = Stream(url=f'wss://{request.host}/media/{call_sid}')
-    connect.append(stream)
-    response.append(connect)
+    response = connect_stream_twiml(session.ws_url)
     
-    print(f"📞 TwiML Response: {str(response)}")
-    return str(response)
+    if Config.LOG_TWIML:
+        log.debug("📞 TwiML Response: %s", response.decode())
+    return twiml_response(response)
 
-@outbound_bp.route("/twilio/continue/<call_sid>", methods=['POST'])
-def continue_outbound_conversation(call_sid):
-    """Continue outbound conversation after processing user input"""
-    
-    try:
-        session = session_manager.get_session(call_sid)
-        if not session or not hasattr(session, 'ready_for_twiml'):
-            print(f"❌ No session or not ready: {call_sid}")
-            response = VoiceResponse()
-            response.say("Processing error")
-            response.hangup()
-            return str(response)
-        
-        # Get prepared response
-        response_type = session.next_response_type
-        content = session.next_response_content
-        transcript = session.next_transcript
-        
-        # Add to conversation history
-        session.add_to_history("Customer", transcript)
-        session.add_to_history("Jason", content)
-        
-        # Build TwiML response
-        twiml_response = VoiceResponse()
-        
-        if response_type == "AUDIO":
-            # Handle audio file response
-            from audio_manager import audio_manager
-            
-            audio_files = [f.strip() for f in content.split('+')]
-            
-            # Validate all files exist
-            if audio_manager.validate_audio_chain(content):
-                for audio_file in audio_files:
-                    audio_url = f"{request.url_root}audio_ulaw/{audio_file}"
-                    twiml_response.play(audio_url)
-                
-                # Log audio response
-                call_logger.log_nisha_audio_response(call_sid, content)
-            else:
-                # Fallback if files don't exist
-                twiml_response.say("I'm having trouble with my audio files.")
-                call_logger.log_nisha_tts_response(call_sid, "Audio file error - fallback")
-        
-        elif response_type == "TTS":
-            # Handle TTS response
-            from tts_engine import tts_engine
-            
-            tts_url = tts_engine.generate_audio_url(content, request.url_root)
-            if tts_url:
-                twiml_response.play(tts_url)
-                call_logger.log_nisha_tts_response(call_sid, content)
-            else:
-                twiml_response.say("Sorry, I'm having trouble generating audio.")
-                call_logger.log_nisha_tts_response(call_sid, "TTS generation failed")
-        
-        # Check for agent transfer request
-        transfer_requested = session.get_session_variable("transfer_requested")
-        if transfer_requested == "yes":
-            print(f"🔄 EXECUTING AGENT TRANSFER for outbound call {call_sid}")
-            
-            # Play transfer message
-            if Config.AGENT_TRANSFER["transfer_message"]:
-                twiml_response.say(Config.AGENT_TRANSFER["transfer_message"])
-            
-            # Transfer the call
-            dial = Dial(
-                timeout=Config.AGENT_TRANSFER["transfer_timeout"],
-                caller_id=Config.TWILIO_PHONE
-            )
-            dial.number(Config.AGENT_TRANSFER["agent_number"])
-            twiml_response.append(dial)
-            
-            # Log transfer with session variables
-            call_logger.log_call_end(call_sid, "transferred_to_agent", session.session_variables)
-            session_manager.remove_session(call_sid)
-            
-            return str(twiml_response)
-        
-        # Check if conversation should end
-        if any(word in content.lower() for word in ["goodbye", "goodbye1.mp3"]):
-            twiml_response.hangup()
-            
-            # Clean up session with session variables
-            call_logger.log_call_end(call_sid, "completed", session.session_variables)
-            session_manager.remove_session(call_sid)
-            
-        else:
-            # Reset session for next input
-            session.reset_for_next_input()
-            
-            # Continue streaming
-            connect = Connect()
-            stream = Stream(url=f'wss://{request.host}/media/{call_sid}')
-            connect.append(stream)
-            twiml_response.append(connect)
-        
-        return str(twiml_response)
-        
-    except Exception as e:
-        print(f"❌ Error in outbound continue: {e}")
-        
-        # Log error and cleanup
-        call_logger.log_call_end(call_sid, "error")
-        session_manager.remove_session(call_sid)
+# Continue conversation after processing user input (shared with inbound)
+outbound_bp.add_url_rule(
+    "/twilio/continue/<call_sid>",
+    view_func=make_continue_handler("outbound", caller_label="Customer", agent_label="Jason"),
+    methods=['POST']
+)
+
+def _call_payload(target_number, lead_data, base_url):
+    """Form data for a Twilio Calls API request to this customer (shared by the sync and async dialers)"""
+    # Ensure phone number has + prefix
+    if not target_number.startswith('+'):
+        target_number = '+' + target_number
         
-        response = VoiceResponse()
-        response.say("I'm having technical difficulties.")
-        response.hangup()
-        return str(response)
+    log.info("📞 Calling %s at %s", lead_data.get('customer_name'), target_number)
+    
+    webhook_url = f"{base_url}/outbound/twilio/outbound/{lead_data['id']}"
+    log.debug("📋 Webhook URL: %s", webhook_url)
+    return {
+        'To': target_number,
+        'From': Config.TWILIO_PHONE,
+        'Url': webhook_url,
+        'Method': 'POST'
+    }
+
+def _track_call(response, lead_data):
+    """Read the call SID from Twilio's response and start tracking the call"""
+    response.raise_for_status()
+    call_sid = response.json()['sid']
+    
+    # Track call info
+    session_manager.track_outbound_call(call_sid, lead_data)
+    
+    log.info("✅ Outbound call initiated: %s", call_sid)
+    return call_sid
 
 def make_outbound_call(target_number, lead_data, base_url):
     """Make an outbound call to a customer/prospect"""
     try:
-        # Ensure phone number has + prefix
-        if not target_number.startswith('+'):
-            target_number = '+' + target_number
-            
-        print(f"📞 Calling {lead_data.get('customer_name')} at {target_number}")
-        
-        call = twilio_client.calls.create(
-            to=target_number,
-            from_=Config.TWILIO_PHONE,
-            url=f"{base_url}/outbound/twilio/outbound/{lead_data['id']}",
-            method='POST'
+        response = twilio_session.post(
+            TWILIO_API + _TWILIO_CALLS_PATH,
+            data=_call_payload(target_number, lead_data, base_url),
+            timeout=(5.0, 15.0)
         )
+        return _track_call(response, lead_data)
         
-        # Track call info
-        session_manager.track_outbound_call(call.sid, lead_data)
-        
-        print(f"✅ Outbound call initiated: {call.sid}")
-        print(f"📋 Webhook URL: {base_url}/outbound/twilio/outbound/{lead_data['id']}")
-        return call.sid
+    except Exception as e:
+        log.error("❌ Failed to make outbound call: %s", e)
+        return None
+
+async def make_outbound_call_async(target_number, lead_data, base_url):
+    """Make an outbound call through the pooled Twilio REST client (campaign loop only)"""
+    try:
+        response = await _twilio_http.post(
+            _TWILIO_CALLS_PATH,
+            data=_call_payload(target_number, lead_data, base_url)
+        )
+        return _track_call(response, lead_data)
         
     except Exception as e:
-        print(f"❌ Failed to make outbound call: {e}")
+        log.error("❌ Failed to make outbound call: %s", e)
         return None
 
-def start_plumbing_calling_campaign(target_list, max_calls=50, base_url=""):
-    """Start mass outbound calling campaign to potential customers"""
+async def _claim_lead(customer):
+    """Atomically mark a lead's number as called; False if it was already called within LEAD_DEDUP_TTL"""
+    phone = customer['phone']
+    if _redis is not None:
+        try:
+            return bool(await _redis.set(f"lead:{phone}:called", "1", ex=Config.LEAD_DEDUP_TTL, nx=True))
+        except Exception as e:
+            log.warning("⚠️ Redis lead dedup unavailable, using local check: %s", e)
+    
+    global _dialled_prune_at
+    now = time.monotonic()
     
-    call_count = 0
-    successful_calls = 0
+    # Evict expired numbers now and then so the map doesn't grow with every uploaded CSV
+    if now >= _dialled_prune_at:
+        for expired_phone in [p for p, expires in _dialled_numbers.items() if expires <= now]:
+            del _dialled_numbers[expired_phone]
+        _dialled_prune_at = now + _DIALLED_PRUNE_INTERVAL
     
+    if _dialled_numbers.get(phone, 0) > now:
+        return False
+    _dialled_numbers[phone] = now + Config.LEAD_DEDUP_TTL
+    return True
+
+async def _release_lead(customer):
+    """Undo _claim_lead when the dial failed, so the lead can be retried by a later campaign"""
+    phone = customer['phone']
+    if _redis is not None:
+        try:
+            await _redis.delete(f"lead:{phone}:called")
+        except Exception as e:
+            log.warning("⚠️ Could not release Redis lead claim for %s: %s", phone, e)
+    _dialled_numbers.pop(phone, None)
+
+async def _lead_worker():
+    """Dial leads as soon as they are queued and the shared rate limit allows (be respectful!)"""
+    while True:
+        customer, base_url = await _lead_queue.get()
+        try:
+            if not await _claim_lead(customer):
+                log.info("⏭️ Skipping %s - already called today", customer['phone'])
+                continue
+            
+            call_sid = None
+            try:
+                async with _dial_limiter:
+                    call_sid = await make_outbound_call_async(customer['phone'], customer, base_url)
+            finally:
+                if not call_sid:
+                    await _release_lead(customer)
+            _campaign_stats["dialled"] += 1
+            if call_sid:
+                _campaign_stats["successful"] += 1
+        finally:
+            _lead_queue.task_done()
+
+async def _start_lead_workers():
+    """Create the lead queue, dial limiter and persistent workers on the campaign loop"""
+    global _lead_queue, _dial_limiter, _redis
+    _lead_queue = asyncio.Queue(maxsize=Config.MAX_QUEUED_LEADS)
+    _dial_limiter = AsyncLimiter(Config.CAMPAIGN_CONCURRENCY, Config.CALL_INTERVAL)
+    
+    if Config.REDIS_URL:
+        if REDIS_AVAILABLE:
+            _redis = aioredis.Redis.from_url(Config.REDIS_URL, decode_responses=True)
+        else:
+            log.warning("⚠️ REDIS_URL is set but redis is not installed - lead dedup is per-process")
+    
+    for _ in range(Config.CAMPAIGN_CONCURRENCY):
+        asyncio.ensure_future(_lead_worker())
+
+async def start_plumbing_calling_campaign(target_list, max_calls=50, base_url=""):
+    """Queue potential customers for the campaign workers to dial"""
+    
+    queued = 0
     for customer in target_list:
-        if call_count >= max_calls:
+        if queued >= max_calls:
             break
-            
+        
         # Check if already called today (in real implementation)
         if not customer.get('called_today', False):
-            call_sid = make_outbound_call(customer['phone'], customer, base_url)
-            
-            if call_sid:
-                successful_calls += 1
-                # Wait between calls (be respectful!)
-                time.sleep(Config.CALL_INTERVAL)
-                
-            call_count += 1
-                
-        if call_count >= max_calls:
-            break
+            await _lead_queue.put((customer, base_url))
+            queued += 1
+            _campaign_stats["queued"] += 1
     
-    print(f"🚀 Plumbing campaign complete: {successful_calls}/{call_count} calls successful")
-    return successful_calls
+    log.info("🚀 Plumbing campaign queued: %d customers", queued)
+    return queued
+
+def _active_campaign_count():
+    """Number of campaign producers that have not finished queueing leads"""
+    return sum(1 for future in list(_active_campaigns) if not future.done())
+
+def _submit_campaign(target_list, max_calls, base_url):
+    """Schedule a campaign producer on the campaign loop, or return None if too many are running"""
+    with _active_campaigns_lock:
+        if _active_campaign_count() >= Config.MAX_CAMPAIGN_WORKERS:
+            return None
+        
+        future = asyncio.run_coroutine_threadsafe(
+            start_plumbing_calling_campaign(target_list, max_calls, base_url),
+            _get_campaign_loop()
+        )
+        _active_campaigns.add(future)
+        return future
+
+def _json_response(payload, status=200):
+    """Serialize an API payload with orjson (faster than Flask's stdlib jsonify for polled endpoints)"""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+def _campaign_busy_response():
+    """HTTP 429 returned when the campaign workers are saturated"""
+    return _json_response({
+        "status": "busy",
+        "message": f"{Config.MAX_CAMPAIGN_WORKERS} campaigns are already running - try again shortly"
+    }, 429)
+
+# Start the campaign loop and lead workers when the blueprint is registered on the app
+outbound_bp.record_once(lambda state: _get_campaign_loop())
 
 @outbound_bp.route("/start_campaign", methods=['POST'])
 def start_campaign():
@@ -294,26 +357,22 @@ def start_campaign():
         # Get base URL for callbacks
         base_url = request.url_root.rstrip('/')
         
-        # Start campaign in background thread
-        campaign_thread = threading.Thread(
-            target=start_plumbing_calling_campaign, 
-            args=(sample_customers, 10, base_url)  # Start with 10 calls
-        )
-        campaign_thread.daemon = True
-        campaign_thread.start()
+        # Schedule campaign on the background event loop
+        if _submit_campaign(sample_customers, 10, base_url) is None:  # Start with 10 calls
+            return _campaign_busy_response()
         
-        return {
+        return _json_response({
             "status": "success", 
             "message": "Plumbing campaign started",
             "max_calls": 10
-        }
+        })
         
     except Exception as e:
-        print(f"❌ Campaign start error: {e}")
-        return {
+        log.error("❌ Campaign start error: %s", e)
+        return _json_response({
             "status": "error", 
             "message": str(e)
-        }
+        })
 
 @outbound_bp.route("/campaign_status", methods=['GET'])
 def get_campaign_status():
@@ -323,41 +382,61 @@ def get_campaign_status():
     # Get recent call stats
     stats = call_logger.get_call_stats(days=1)
     
-    return {
+    return _json_response({
         "active_calls": active_count,
+        "active_campaigns": _active_campaign_count(),
+        "leads_waiting": _lead_queue.qsize() if _lead_queue else 0,
+        "campaign_totals": dict(_campaign_stats),
         "today_stats": stats,
         "message": f"Currently {active_count} active calls"
-    }
+    })
+
+def _csv_field(row, index, default):
+    """Read a column by index, falling back when the column is absent or the row is short"""
+    return row[index] if index is not None and index < len(row) else default
 
 def load_customers_from_csv(csv_file_path):
-    """Load customer data from CSV file for outbound campaigns"""
+    """Stream customer data from CSV file for outbound campaigns (yields one customer per valid row)"""
     import csv
     
-    customers = []
     try:
-        with open(csv_file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        with open(csv_file_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            columns = {name: i for i, name in enumerate(header or [])}
+            
+            # Ensure required fields exist
+            phone_i = columns.get('phone')
+            if phone_i is None:
+                log.error("❌ CSV has no 'phone' column: %s", csv_file_path)
+                return
+            
+            id_i, name_i, type_i, address_i, service_i, notes_i = (
+                columns.get(name) for name in ('id', 'customer_name', 'type', 'address', 'service_needed', 'notes')
+            )
+            
+            loaded = 0
             for row in reader:
-                # Ensure required fields exist
-                if 'phone' in row and row['phone'].strip():
-                    customer = {
-                        'id': row.get('id', str(len(customers) + 1)),
-                        'customer_name': row.get('customer_name', 'Customer'),
-                        'phone': row['phone'].strip(),
-                        'type': row.get('type', 'lead'),
-                        'address': row.get('address', ''),
-                        'service_needed': row.get('service_needed', ''),
-                        'notes': row.get('notes', ''),
-                        'called_today': False
-                    }
-                    customers.append(customer)
+                phone = _csv_field(row, phone_i, '').strip()
+                if not phone:
+                    continue
+                
+                loaded += 1
+                yield {
+                    'id': _csv_field(row, id_i, str(loaded)),
+                    'customer_name': _csv_field(row, name_i, 'Customer'),
+                    'phone': phone,
+                    'type': _csv_field(row, type_i, 'lead'),
+                    'address': _csv_field(row, address_i, ''),
+                    'service_needed': _csv_field(row, service_i, ''),
+                    'notes': _csv_field(row, notes_i, ''),
+                    'called_today': False
+                }
         
-        print(f"📋 Loaded {len(customers)} customers from CSV: {csv_file_path}")
-        return customers
+        log.info("📋 Streamed %d customers from CSV: %s", loaded, csv_file_path)
         
     except Exception as e:
-        print(f"❌ Error loading CSV: {e}")
-        return []
+        log.error("❌ Error loading CSV: %s", e)
 
 @outbound_bp.route("/start_csv_campaign", methods=['POST'])
 def start_csv_campaign():
@@ -367,19 +446,10 @@ def start_csv_campaign():
         csv_file = "customer_data/leads.csv"
         
         if not os.path.exists(csv_file):
-            return {
+            return _json_response({
                 "status": "error",
                 "message": f"CSV file not found: {csv_file}"
-            }
-        
-        # Load customers from CSV
-        customers = load_customers_from_csv(csv_file)
-        
-        if not customers:
-            return {
-                "status": "error",
-                "message": "No valid customers found in CSV"
-            }
+            })
         
         # Get base URL for callbacks
         base_url = request.url_root.rstrip('/')
@@ -387,24 +457,30 @@ def start_csv_campaign():
         # Get max calls from request (default 10)
         max_calls = request.json.get('max_calls', 10) if request.json else 10
         
-        # Start campaign in background thread
-        campaign_thread = threading.Thread(
-            target=start_plumbing_calling_campaign, 
-            args=(customers, max_calls, base_url)
-        )
-        campaign_thread.daemon = True
-        campaign_thread.start()
+        # Read the first customer here so an empty/invalid CSV is reported to the caller
+        customers = load_customers_from_csv(csv_file)
+        first_customer = next(customers, None)
+        if first_customer is None:
+            return _json_response({
+                "status": "error",
+                "message": "No valid customers found in CSV"
+            })
+        
+        # Stream the remaining CSV rows into the lead queue on the background event loop
+        # (first customer is dialled before the rest of the file is read)
+        if _submit_campaign(chain((first_customer,), customers), max_calls, base_url) is None:
+            customers.close()  # Release the open CSV file
+            return _campaign_busy_response()
         
-        return {
+        return _json_response({
             "status": "success", 
-            "message": f"CSV campaign started with {len(customers)} customers",
-            "total_customers": len(customers),
+            "message": "CSV campaign started - customers are queued as the file is read",
             "max_calls": max_calls
-        }
+        })
         
     except Exception as e:
-        print(f"❌ CSV campaign start error: {e}")
-        return {
+        log.error("❌ CSV campaign start error: %s", e)
+        return _json_response({
             "status": "error", 
             "message": str(e)
-        }
\ No newline at end of file
+        })
\ No newline at end of file
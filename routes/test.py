@@ -4,68 +4,120 @@ KLARIQO TESTING ROUTES
 Browser-friendly test endpoints for development and demos
 """
 
-import os
-import sys
+import gzip
+import hashlib
+import time
+import threading
+from functools import lru_cache
 
-# Fix import path for parent directory modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from flask import Blueprint, request
+from flask import Blueprint, Response, request
+from jinja2 import DictLoader, Environment
+from markupsafe import escape
+from config import Config
 from routes.outbound import make_outbound_call
 from session import session_manager
 from logger import call_logger
 from audio_manager import audio_manager
 from tts_engine import tts_engine
+from providers import warm_up_in_background
 
 # Create blueprint for test routes
 test_bp = Blueprint('test', __name__)
 
-@test_bp.route("/call_test/<phone_number>", methods=['GET'])
-def call_test(phone_number):
-    """Browser-friendly test endpoint - call any number"""
+# Open provider connections in the background as soon as the app registers this blueprint
+test_bp.record_once(lambda state: warm_up_in_background())
+
+# Debug pages smaller than this are sent uncompressed (gzip overhead outweighs the saving)
+_GZIP_MIN_BYTES = 512
+
+@test_bp.after_request
+def _gzip_html(response):
+    """Gzip HTML debug pages for clients that accept it (fastest level - these are built per request)"""
+    if (response.mimetype != 'text/html'
+            or response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '')):
+        return response
+    
+    body = response.get_data()
+    if len(body) < _GZIP_MIN_BYTES:
+        return response
+    
+    response.set_data(gzip.compress(body, compresslevel=1))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+# Client persona shown on the test/debug pages (fixed at startup)
+_ASSISTANT = Config.CLIENT_CONFIG["ai_assistant_name"]
+_INDUSTRY = Config.CLIENT_CONFIG["industry"]
+
+# Last ElevenLabs probe result - one real synthesis per _TTS_PROBE_MAX_AGE, shared by all health checks
+_TTS_PROBE_MAX_AGE = 60  # seconds
+_tts_probe = {"checked_at": None, "ok": False}
+_tts_probe_lock = threading.Lock()
+
+def _tts_probe_stale():
+    """True when no probe has run yet or the last one is older than _TTS_PROBE_MAX_AGE"""
+    checked_at = _tts_probe["checked_at"]
+    return checked_at is None or time.monotonic() - checked_at >= _TTS_PROBE_MAX_AGE
+
+def _run_tts_probe():
+    """Synthesize a test phrase and record the result"""
+    _tts_probe["ok"] = tts_engine.test_voice()
+    _tts_probe["checked_at"] = time.monotonic()
+
+def _background_tts_probe():
+    """Probe thread body - _tts_probe_lock was acquired by the request that started it"""
     try:
-        # Add + if not present
-        if not phone_number.startswith('+'):
-            phone_number = '+' + phone_number
-            
-        lead_data = {
-            'id': 'test_123',
-            'customer_name': 'Test Customer Demo',
-            'type': 'test'
-        }
-        
-        # Get base URL for callback
-        base_url = request.url_root.rstrip('/')
-        
-        call_sid = make_outbound_call(phone_number, lead_data, base_url)
-        
-        if call_sid:
-            return f"""
-            <h2>✅ Test Call Initiated!</h2>
-            <p><strong>Call SID:</strong> {call_sid}</p>
-            <p><strong>Phone:</strong> {phone_number}</p>
-            <p><strong>Customer:</strong> {lead_data['customer_name']}</p>
-            <p>Your phone should ring in 5-10 seconds!</p>
-            <p><a href="/test">← Back to Test Menu</a></p>
-            """
-        else:
-            return f"""
-            <h2>❌ Call Failed</h2>
-            <p>Could not initiate call to {phone_number}</p>
-            <p><a href="/test">← Back to Test Menu</a></p>
-            """
-            
-    except Exception as e:
-        return f"""
-        <h2>❌ Error</h2>
-        <p>Error: {str(e)}</p>
-        <p><a href="/test">← Back to Test Menu</a></p>
-        """
+        _run_tts_probe()
+    finally:
+        _tts_probe_lock.release()
 
-@test_bp.route("/test")
-def test_page():
-    """Main test page with all testing options"""
-    return """
+def _tts_probe_ok(refresh=True):
+    """
+    Return the cached TTS probe result, re-running tts_engine.test_voice() once it is stale
+    
+    With refresh=False never blocks - a stale result starts one background probe (single-flight)
+    and the last result is returned, or None if no probe has finished yet
+    """
+    if not refresh:
+        if _tts_probe_stale() and _tts_probe_lock.acquire(blocking=False):
+            try:
+                threading.Thread(target=_background_tts_probe, name="tts-probe", daemon=True).start()
+            except Exception:
+                _tts_probe_lock.release()
+                raise
+        return _tts_probe["ok"] if _tts_probe["checked_at"] is not None else None
+    
+    with _tts_probe_lock:
+        if _tts_probe_stale():
+            _run_tts_probe()
+        return _tts_probe["ok"]
+
+_TTS_STATUS = {True: "✅ OK", False: "❌ Failed", None: "⏳ Not checked yet"}
+
+def _render_api_keys_block():
+    """Build the API key section of the health page (keys come from the environment at startup)"""
+    api_checks = (
+        ("Deepgram API", "✅ Set" if Config.DEEPGRAM_API_KEY else "❌ Missing"),
+        ("Groq API", "✅ Set" if Config.GROQ_API_KEY else "❌ Missing"),
+        ("ElevenLabs API", "✅ Set" if Config.ELEVENLABS_API_KEY else "❌ Missing"),
+        ("Twilio Account", "✅ Set" if Config.TWILIO_ACCOUNT_SID else "❌ Missing"),
+    )
+    
+    return (
+        "<h3>🔑 API Keys:</h3>\n<ul>\n"
+        + "".join(f"<li><strong>{api}:</strong> {status}</li>\n" for api, status in api_checks)
+        + "</ul>\n<p><a href='/test'>← Back to Test Page</a></p>"
+    )
+
+_API_KEYS_HTML = _render_api_keys_block()
+
+# Main test page - depends only on the client persona, so built once at import
+_TEST_PAGE_HTML = f"""
     <h1>🧪 Klariqo Testing Dashboard</h1>
     
     <h3>📞 Test Outbound Calls:</h3>
@@ -77,7 +129,7 @@ def test_page():
     
     <h3>🎯 Campaign Management:</h3>
     <ul>
-        <li><a href="/outbound/start_campaign" onclick="return confirm('Start campaign?')">Start Plumbing Campaign (POST)</a></li>
+        <li><a href="/outbound/start_campaign" onclick="return confirm('Start campaign?')">Start {_INDUSTRY.title()} Campaign (POST)</a></li>
         <li><a href="/outbound/start_csv_campaign" onclick="return confirm('Start CSV campaign?')">Start CSV Campaign (POST)</a></li>
         <li><a href="/outbound/campaign_status">View Campaign Status</a></li>
     </ul>
@@ -86,57 +138,156 @@ def test_page():
     <ul>
         <li><a href="/debug/audio_files">View Audio Files</a></li>
         <li><a href="/debug/call_logs">Download Call Logs</a></li>
-        <li><a href="/debug/system_health">System Health Check</a></li>
+        <li><a href="/debug/system_health">System Health Check</a> (<a href="/debug/system_health?quick=1">quick</a> - for uptime monitors)</li>
         <li><a href="/debug/call_forwarding">Call Forwarding Status</a></li>
         <li><a href="/debug/agent_transfer">Agent Transfer Status</a></li>
     </ul>
     
+    <h3>🔬 Profiling:</h3>
+    <ul>
+        <li>Set <code>PROFILING_ENABLED=true</code> in <code>.env</code> and restart</li>
+        <li>Every request then writes a <code>.prof</code> file to <code>logs/profiles/</code></li>
+        <li>Open one with <code>snakeviz logs/profiles/&lt;file&gt;.prof</code> to see where the time went</li>
+    </ul>
+    
     <br>
     <p><strong>Instructions:</strong></p>
     <ol>
         <li>Click a test link above (update phone number first)</li>
         <li>Your phone should ring in 5-10 seconds</li>
-        <li>Answer the call and pretend to be a customer asking about plumbing</li>
-        <li>Jason will handle your inquiry with personalized responses!</li>
+        <li>Answer the call and pretend to be a customer asking about {_INDUSTRY}</li>
+        <li>{_ASSISTANT} will handle your inquiry with personalized responses!</li>
         <li>Ask about services, pricing, booking, etc!</li>
     </ol>
     
     <p><strong>👤 Customer Name Personalization:</strong></p>
     <ul>
-        <li>When using CSV campaigns, Jason will know the customer's name</li>
-        <li>He'll use it for personalization (e.g., "Thanks John!")</li>
+        <li>When using CSV campaigns, {_ASSISTANT} will know the customer's name</li>
+        <li>The name is used for personalization (e.g., "Thanks John!")</li>
         <li>Check the CSV file in <code>customer_data/leads.csv</code></li>
     </ul>
     
-    <p><strong>🔧 Experience professional plumbing service - with personalization!</strong></p>
+    <p><strong>🔧 Experience professional {_INDUSTRY} service - with personalization!</strong></p>
     
     <hr>
     <p><small>Klariqo v3.0 - Twilio μ-law Streaming | Patent Pending</small></p>
     """
 
+# Audio files page - compiled once into a module-global environment (no per-render stat or reparse)
+_AUDIO_FILES_TEMPLATE = """<h2>🎵 Audio Files Status</h2>
+<table border='1' style='border-collapse: collapse;'>
+<tr><th>Filename</th><th>Category</th><th>Transcript</th><th>Status</th></tr>
+{% for file in files %}{% set status = statuses[file.exists|int] %}<tr>
+            <td>{{ file.filename }}</td>
+            <td>{{ file.category }}</td>
+            <td style='max-width: 300px;'>{{ file.transcript }}</td>
+            <td style='color: {{ status.status_color }};'>{{ status.status }}</td>
+        </tr>
+{% endfor %}</table>
+<p><a href='/test'>← Back to Test Page</a></p>"""
+# Indexed by bool(exists): 0 -> missing, 1 -> available
+_AUDIO_STATUS = (
+    {'status': "❌ Missing", 'status_color': "red"},
+    {'status': "✅ Available", 'status_color': "green"},
+)
+_templates = Environment(
+    loader=DictLoader({"audio_files.html": _AUDIO_FILES_TEMPLATE}),
+    auto_reload=False,
+    cache_size=-1,
+    autoescape=True,
+)
+
+# Static tail of the call forwarding page
+_FORWARDING_HOWTO_HTML = (
+    "<h3>🔧 How to Change:</h3>\n"
+    "<p>To enable/disable call forwarding, edit <code>config.py</code>:</p>\n"
+    "<pre><code># In config.py, find CALL_FORWARDING section:\n"
+    "CALL_FORWARDING = {\n"
+    "    \"enabled\": True,  # Set to True to enable forwarding\n"
+    "    \"forward_to_number\": \"+61412345678\",  # Your existing number\n"
+    "    \"forward_message\": \"Please hold...\",  # Message before transfer\n"
+    "    \"timeout\": 30  # Timeout in seconds\n"
+    "}</code></pre>\n"
+    "<p><a href='/test'>← Back to Test Page</a></p>"
+)
+
+# Static tail of the agent transfer page
+_AGENT_TRANSFER_SCENARIOS_HTML = (
+    "<h3>🧪 Test Scenarios:</h3>\n"
+    "<p>To test agent transfer:</p>\n"
+    "<ol>\n"
+    f"<li>Start a call with {_ASSISTANT}</li>\n"
+    "<li>Say: \"I want to speak to a human\"</li>\n"
+    "<li>Or say: \"This is an emergency\"</li>\n"
+    f"<li>{_ASSISTANT} should transfer you to the agent number</li>\n"
+    "</ol>\n"
+    "<p><a href='/test'>← Back to Test Page</a></p>"
+)
+
+# Characters people type in phone numbers that Twilio won't accept
+_PHONE_STRIP = str.maketrans("", "", " -()")
+
+@test_bp.route("/call_test/<phone_number>", methods=['GET'])
+def call_test(phone_number):
+    """Browser-friendly test endpoint - call any number"""
+    try:
+        # Normalise to E.164: drop spaces/dashes/brackets, then exactly one leading +
+        digits = phone_number.translate(_PHONE_STRIP).lstrip('+')
+        if not digits.isdigit():
+            return f"""
+            <h2>❌ Invalid Number</h2>
+            <p>{escape(phone_number)} is not a phone number (digits, spaces, dashes and brackets only)</p>
+            <p><a href="/test">← Back to Test Menu</a></p>
+            """
+        phone_number = '+' + digits
+            
+        lead_data = {
+            'id': 'test_123',
+            'customer_name': 'Test Customer Demo',
+            'type': 'test'
+        }
+        
+        # Get base URL for callback
+        base_url = request.url_root.rstrip('/')
+        
+        call_sid = make_outbound_call(phone_number, lead_data, base_url)
+        
+        if call_sid:
+            return f"""
+            <h2>✅ Test Call Initiated!</h2>
+            <p><strong>Call SID:</strong> {call_sid}</p>
+            <p><strong>Phone:</strong> {phone_number}</p>
+            <p><strong>Customer:</strong> {lead_data['customer_name']}</p>
+            <p>Your phone should ring in 5-10 seconds!</p>
+            <p><a href="/test">← Back to Test Menu</a></p>
+            """
+        else:
+            return f"""
+            <h2>❌ Call Failed</h2>
+            <p>Could not initiate call to {phone_number}</p>
+            <p><a href="/test">← Back to Test Menu</a></p>
+            """
+            
+    except Exception as e:
+        return f"""
+        <h2>❌ Error</h2>
+        <p>Error: {str(e)}</p>
+        <p><a href="/test">← Back to Test Menu</a></p>
+        """
+
+@test_bp.route("/test")
+def test_page():
+    """Main test page with all testing options"""
+    return _TEST_PAGE_HTML
+
 @test_bp.route("/debug/audio_files")
 def debug_audio_files():
     """Debug page showing all audio files"""
     audio_files = audio_manager.list_all_files()
     
-    html = "<h2>🎵 Audio Files Status</h2>\n<table border='1' style='border-collapse: collapse;'>\n"
-    html += "<tr><th>Filename</th><th>Category</th><th>Transcript</th><th>Status</th></tr>\n"
-    
-    for file_info in audio_files:
-        status = "✅ Available" if file_info['exists'] else "❌ Missing"
-        status_color = "green" if file_info['exists'] else "red"
-        
-        html += f"""<tr>
-            <td>{file_info['filename']}</td>
-            <td>{file_info['category']}</td>
-            <td style='max-width: 300px;'>{file_info['transcript']}</td>
-            <td style='color: {status_color};'>{status}</td>
-        </tr>\n"""
-    
-    html += "</table>\n"
-    html += f"<p><a href='/test'>← Back to Test Page</a></p>"
-    
-    return html
+    # Stream rows as they are rendered instead of building the whole table first
+    template = _templates.get_template("audio_files.html")
+    return Response(template.generate(files=audio_files, statuses=_AUDIO_STATUS), mimetype='text/html')
 
 @test_bp.route("/debug/call_logs")
 def debug_call_logs():
@@ -167,144 +318,146 @@ def debug_call_logs():
 
 @test_bp.route("/debug/system_health")
 def debug_system_health():
-    """System health check"""
+    """System health check (?quick=1 for uptime monitors - never calls ElevenLabs)"""
+    quick = bool(request.args.get('quick'))
     
     # Test all components
-    health_checks = {
-        "Audio Manager": "✅ OK" if len(audio_manager.cached_files) > 0 else "❌ No audio files",
-        "TTS Engine": "✅ OK" if tts_engine.test_voice() else "❌ Failed",
-        "Session Manager": f"✅ OK ({session_manager.get_active_count()} active)",
-        "Call Logger": "✅ OK",  # Always OK if we got here
-    }
-    
-    # Check API keys
-    from config import Config
-    api_checks = {
-        "Deepgram API": "✅ Set" if Config.DEEPGRAM_API_KEY else "❌ Missing",
-        "Groq API": "✅ Set" if Config.GROQ_API_KEY else "❌ Missing", 
-        "ElevenLabs API": "✅ Set" if Config.ELEVENLABS_API_KEY else "❌ Missing",
-        "Twilio Account": "✅ Set" if Config.TWILIO_ACCOUNT_SID else "❌ Missing",
-    }
-    
-    html = "<h2>🏥 System Health Check</h2>\n"
-    
-    html += "<h3>📡 Components:</h3>\n<ul>\n"
-    for component, status in health_checks.items():
-        html += f"<li><strong>{component}:</strong> {status}</li>\n"
+    health_checks = (
+        ("Audio Manager", "✅ OK" if audio_manager.has_files else "❌ No audio files"),
+        ("TTS Engine", _TTS_STATUS[_tts_probe_ok(refresh=not quick)]),
+        ("Session Manager", f"✅ OK ({session_manager.get_active_count()} active)"),
+        ("Call Logger", "✅ OK"),  # Always OK if we got here
+    )
+    
+    html = "<h2>🏥 System Health Check</h2>\n<h3>📡 Components:</h3>\n<ul>\n"
+    html += "".join(f"<li><strong>{component}:</strong> {status}</li>\n" for component, status in health_checks)
     html += "</ul>\n"
     
-    html += "<h3>🔑 API Keys:</h3>\n<ul>\n"
-    for api, status in api_checks.items():
-        html += f"<li><strong>{api}:</strong> {status}</li>\n"
-    html += "</ul>\n"
-    
-    html += "<p><a href='/test'>← Back to Test Page</a></p>"
+    # API keys (fixed at startup)
+    html += _API_KEYS_HTML
     
     return html
 
-@test_bp.route("/debug/call_forwarding")
-def debug_call_forwarding():
-    """Test call forwarding configuration"""
-    from config import Config
+def _with_etag(html):
+    """Pair a rendered page with its ETag (hashed once, alongside the cached render)"""
+    return html, hashlib.blake2b(html.encode(), digest_size=8).hexdigest()
+
+def _conditional_page(page):
+    """Answer 304 when the client already holds this page, else send it with its ETag"""
+    html, etag = page
     
-    html = "<h2>📞 Call Forwarding Configuration</h2>\n"
+    # Weak validator - _gzip_html may serve the same page gzipped or as identity bytes
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(html, mimetype='text/html')
+    response.set_etag(etag, weak=True)
+    response.vary.add('Accept-Encoding')
+    return response
+
+@lru_cache(maxsize=None)
+def _render_call_forwarding(enabled, forward_to_number, forward_message, timeout):
+    """Build the call forwarding page and its ETag (cached per configuration)"""
+    parts = ["<h2>📞 Call Forwarding Configuration</h2>\n"]
     
     # Show current configuration
-    html += "<h3>⚙️ Current Settings:</h3>\n<ul>\n"
-    html += f"<li><strong>Enabled:</strong> {'✅ Yes' if Config.CALL_FORWARDING['enabled'] else '❌ No'}</li>\n"
-    html += f"<li><strong>Forward To:</strong> {Config.CALL_FORWARDING['forward_to_number']}</li>\n"
-    html += f"<li><strong>Message:</strong> \"{Config.CALL_FORWARDING['forward_message']}\"</li>\n"
-    html += f"<li><strong>Timeout:</strong> {Config.CALL_FORWARDING['timeout']} seconds</li>\n"
-    html += "</ul>\n"
+    parts.append("<h3>⚙️ Current Settings:</h3>\n<ul>\n")
+    parts.append(f"<li><strong>Enabled:</strong> {'✅ Yes' if enabled else '❌ No'}</li>\n")
+    parts.append(f"<li><strong>Forward To:</strong> {forward_to_number}</li>\n")
+    parts.append(f"<li><strong>Message:</strong> \"{forward_message}\"</li>\n")
+    parts.append(f"<li><strong>Timeout:</strong> {timeout} seconds</li>\n")
+    parts.append("</ul>\n")
     
     # Show what happens based on current setting
-    if Config.CALL_FORWARDING['enabled']:
-        html += "<h3>🔄 Current Behavior:</h3>\n"
-        html += "<p style='color: green;'><strong>✅ CALLS WILL BE FORWARDED</strong></p>\n"
-        html += f"<p>When someone calls your Twilio number, they will:</p>\n"
-        html += f"<ol>\n"
-        html += f"<li>Hear: \"{Config.CALL_FORWARDING['forward_message']}\"</li>\n"
-        html += f"<li>Be transferred to: {Config.CALL_FORWARDING['forward_to_number']}</li>\n"
-        html += f"<li>If no answer within {Config.CALL_FORWARDING['timeout']} seconds, call ends</li>\n"
-        html += f"</ol>\n"
+    if enabled:
+        parts.append("<h3>🔄 Current Behavior:</h3>\n")
+        parts.append("<p style='color: green;'><strong>✅ CALLS WILL BE FORWARDED</strong></p>\n")
+        parts.append("<p>When someone calls your Twilio number, they will:</p>\n")
+        parts.append("<ol>\n")
+        parts.append(f"<li>Hear: \"{forward_message}\"</li>\n")
+        parts.append(f"<li>Be transferred to: {forward_to_number}</li>\n")
+        parts.append(f"<li>If no answer within {timeout} seconds, call ends</li>\n")
+        parts.append("</ol>\n")
     else:
-        html += "<h3>🤖 Current Behavior:</h3>\n"
-        html += "<p style='color: blue;'><strong>✅ AI ASSISTANT MODE</strong></p>\n"
-        html += f"<p>When someone calls your Twilio number, they will:</p>\n"
-        html += f"<ol>\n"
-        html += f"<li>Be greeted by Jason (AI assistant)</li>\n"
-        html += f"<li>Have a conversation about plumbing services</li>\n"
-        html += f"<li>Get help with bookings, pricing, and inquiries</li>\n"
-        html += f"</ol>\n"
+        parts.append("<h3>🤖 Current Behavior:</h3>\n")
+        parts.append("<p style='color: blue;'><strong>✅ AI ASSISTANT MODE</strong></p>\n")
+        parts.append("<p>When someone calls your Twilio number, they will:</p>\n")
+        parts.append("<ol>\n")
+        parts.append(f"<li>Be greeted by {_ASSISTANT} (AI assistant)</li>\n")
+        parts.append(f"<li>Have a conversation about {_INDUSTRY} services</li>\n")
+        parts.append("<li>Get help with bookings, pricing, and inquiries</li>\n")
+        parts.append("</ol>\n")
     
     # Configuration instructions
-    html += "<h3>🔧 How to Change:</h3>\n"
-    html += "<p>To enable/disable call forwarding, edit <code>config.py</code>:</p>\n"
-    html += "<pre><code># In config.py, find CALL_FORWARDING section:\n"
-    html += "CALL_FORWARDING = {\n"
-    html += "    \"enabled\": True,  # Set to True to enable forwarding\n"
-    html += "    \"forward_to_number\": \"+61412345678\",  # Your existing number\n"
-    html += "    \"forward_message\": \"Please hold...\",  # Message before transfer\n"
-    html += "    \"timeout\": 30  # Timeout in seconds\n"
-    html += "}</code></pre>\n"
-    
-    html += "<p><a href='/test'>← Back to Test Page</a></p>"
+    parts.append(_FORWARDING_HOWTO_HTML)
     
-    return html
+    return _with_etag("".join(parts))
 
-@test_bp.route("/debug/agent_transfer")
-def debug_agent_transfer():
-    """Test agent transfer configuration"""
-    from config import Config
-    
-    html = "<h2>👥 Agent Transfer Configuration</h2>\n"
+@test_bp.route("/debug/call_forwarding")
+def debug_call_forwarding():
+    """Test call forwarding configuration"""
+    forwarding = Config.CALL_FORWARDING
+    return _conditional_page(_render_call_forwarding(
+        forwarding['enabled'],
+        forwarding['forward_to_number'],
+        forwarding['forward_message'],
+        forwarding['timeout']
+    ))
+
+@lru_cache(maxsize=None)
+def _render_agent_transfer(enabled, agent_number, transfer_message, transfer_timeout,
+                           transfer_keywords, auto_transfer_conditions):
+    """Build the agent transfer page and its ETag (cached per configuration)"""
+    parts = ["<h2>👥 Agent Transfer Configuration</h2>\n"]
     
     # Show current configuration
-    html += "<h3>⚙️ Current Settings:</h3>\n<ul>\n"
-    html += f"<li><strong>Enabled:</strong> {'✅ Yes' if Config.AGENT_TRANSFER['enabled'] else '❌ No'}</li>\n"
-    html += f"<li><strong>Agent Number:</strong> {Config.AGENT_TRANSFER['agent_number']}</li>\n"
-    html += f"<li><strong>Transfer Message:</strong> \"{Config.AGENT_TRANSFER['transfer_message']}\"</li>\n"
-    html += f"<li><strong>Timeout:</strong> {Config.AGENT_TRANSFER['transfer_timeout']} seconds</li>\n"
-    html += "</ul>\n"
+    parts.append("<h3>⚙️ Current Settings:</h3>\n<ul>\n")
+    parts.append(f"<li><strong>Enabled:</strong> {'✅ Yes' if enabled else '❌ No'}</li>\n")
+    parts.append(f"<li><strong>Agent Number:</strong> {agent_number}</li>\n")
+    parts.append(f"<li><strong>Transfer Message:</strong> \"{transfer_message}\"</li>\n")
+    parts.append(f"<li><strong>Timeout:</strong> {transfer_timeout} seconds</li>\n")
+    parts.append("</ul>\n")
     
     # Show transfer keywords
-    html += "<h3>🔑 Transfer Keywords:</h3>\n<ul>\n"
-    for keyword in Config.AGENT_TRANSFER['transfer_keywords']:
-        html += f"<li><code>{keyword}</code></li>\n"
-    html += "</ul>\n"
+    parts.append("<h3>🔑 Transfer Keywords:</h3>\n<ul>\n")
+    parts.extend(f"<li><code>{keyword}</code></li>\n" for keyword in transfer_keywords)
+    parts.append("</ul>\n")
     
     # Show auto-transfer conditions
-    html += "<h3>🚨 Auto-Transfer Conditions:</h3>\n<ul>\n"
-    for condition in Config.AGENT_TRANSFER['auto_transfer_conditions']:
-        html += f"<li><code>{condition}</code></li>\n"
-    html += "</ul>\n"
+    parts.append("<h3>🚨 Auto-Transfer Conditions:</h3>\n<ul>\n")
+    parts.extend(f"<li><code>{condition}</code></li>\n" for condition in auto_transfer_conditions)
+    parts.append("</ul>\n")
     
     # Show what happens
-    if Config.AGENT_TRANSFER['enabled']:
-        html += "<h3>🔄 Transfer Behavior:</h3>\n"
-        html += "<p style='color: green;'><strong>✅ AGENT TRANSFER ENABLED</strong></p>\n"
-        html += f"<p>During AI conversations, customers can:</p>\n"
-        html += f"<ol>\n"
-        html += f"<li>Say transfer keywords (e.g., \"speak to agent\")</li>\n"
-        html += f"<li>Be automatically transferred for urgent issues</li>\n"
-        html += f"<li>Hear: \"{Config.AGENT_TRANSFER['transfer_message']}\"</li>\n"
-        html += f"<li>Be transferred to: {Config.AGENT_TRANSFER['agent_number']}</li>\n"
-        html += f"</ol>\n"
+    if enabled:
+        parts.append("<h3>🔄 Transfer Behavior:</h3>\n")
+        parts.append("<p style='color: green;'><strong>✅ AGENT TRANSFER ENABLED</strong></p>\n")
+        parts.append("<p>During AI conversations, customers can:</p>\n")
+        parts.append("<ol>\n")
+        parts.append("<li>Say transfer keywords (e.g., \"speak to agent\")</li>\n")
+        parts.append("<li>Be automatically transferred for urgent issues</li>\n")
+        parts.append(f"<li>Hear: \"{transfer_message}\"</li>\n")
+        parts.append(f"<li>Be transferred to: {agent_number}</li>\n")
+        parts.append("</ol>\n")
     else:
-        html += "<h3>🤖 Current Behavior:</h3>\n"
-        html += "<p style='color: blue;'><strong>✅ AI-ONLY MODE</strong></p>\n"
-        html += f"<p>All conversations stay with Jason (AI assistant)</p>\n"
+        parts.append("<h3>🤖 Current Behavior:</h3>\n")
+        parts.append("<p style='color: blue;'><strong>✅ AI-ONLY MODE</strong></p>\n")
+        parts.append(f"<p>All conversations stay with {_ASSISTANT} (AI assistant)</p>\n")
     
     # Test scenarios
-    html += "<h3>🧪 Test Scenarios:</h3>\n"
-    html += "<p>To test agent transfer:</p>\n"
-    html += "<ol>\n"
-    html += "<li>Start a call with Jason</li>\n"
-    html += "<li>Say: \"I want to speak to a human\"</li>\n"
-    html += "<li>Or say: \"This is an emergency\"</li>\n"
-    html += "<li>Jason should transfer you to the agent number</li>\n"
-    html += "</ol>\n"
-    
-    html += "<p><a href='/test'>← Back to Test Page</a></p>"
-    
-    return html
\ No newline at end of file
+    parts.append(_AGENT_TRANSFER_SCENARIOS_HTML)
+    
+    return _with_etag("".join(parts))
+
+@test_bp.route("/debug/agent_transfer")
+def debug_agent_transfer():
+    """Test agent transfer configuration"""
+    transfer = Config.AGENT_TRANSFER
+    return _conditional_page(_render_agent_transfer(
+        transfer['enabled'],
+        transfer['agent_number'],
+        transfer['transfer_message'],
+        transfer['transfer_timeout'],
+        tuple(transfer['transfer_keywords']),
+        tuple(transfer['auto_transfer_conditions'])
+    ))
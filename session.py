@@ -5,25 +5,116 @@ Handles call session states for both inbound and outbound calls
 """
 
 import time
+import threading
+from collections import deque
+from itertools import islice
 from config import Config
 
+# Session template (key, default) pairs - the key set is fixed, so sessions fill their dicts from these
+_FLAG_DEFAULTS = tuple(Config.SESSION_FLAGS_TEMPLATE.items())
+_VARIABLE_DEFAULTS = tuple(Config.SESSION_VARIABLES_TEMPLATE.items())
+
+# Last formatted history timestamp as (epoch second, "HH:MM:SS") - swapped as one tuple so threads never see a torn pair
+_history_ts = (0, "")
+
+def _history_timestamp():
+    """Local "HH:MM:SS" for history entries, formatted at most once per second"""
+    global _history_ts
+    now = int(time.time())
+    second, text = _history_ts
+    if now != second:
+        text = time.strftime("%H:%M:%S", time.localtime(now))
+        _history_ts = (now, text)
+    return text
+
+class CustomerData:
+    """Customer details for an outbound call (fixed fields, no per-instance __dict__)"""
+    
+    __slots__ = ('id', 'customer_name', 'type', 'phone', 'address', 'service_needed', 'notes', 'call_purpose')
+    _FIELDS = frozenset(__slots__)
+    
+    def __init__(self, id, customer_name='Customer', type='lead', phone='', address='',
+                 service_needed='', notes='', call_purpose='service_inquiry'):
+        self.id = id
+        self.customer_name = customer_name
+        self.type = type
+        self.phone = phone
+        self.address = address
+        self.service_needed = service_needed
+        self.notes = notes
+        self.call_purpose = call_purpose
+    
+    def get(self, key, default=None):
+        """dict-style access so existing lead_data.get(...) callers keep working"""
+        return getattr(self, key) if key in self._FIELDS else default
+    
+    def __getitem__(self, key):
+        if key not in self._FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def to_dict(self):
+        """Plain dict copy (for logs/exports)"""
+        return {field: getattr(self, field) for field in self.__slots__}
+    
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
 class StreamingSession:
     """Manages individual call session state and memory"""
     
+    # Fixed attribute set - no per-instance __dict__ (includes the fields the routes and media stream fill in)
+    __slots__ = (
+        'call_sid', 'call_direction', 'lead_data', 'start_time',
+        'session_memory', 'session_variables',
+        'conversation_history', '_history_total', '_accumulated_parts',
+        'last_activity_time', 'silence_threshold',
+        'is_processing', 'completed_transcript', 'transcript_ready',
+        'dg_connection', 'deepgram_future', 'twilio_ws', 'stream_sid',
+        'selected_intro', 'base_url', 'ws_url',
+        'next_response_type', 'next_response_content', 'next_transcript', 'ready_for_twiml',
+        '_ctx_cached', '_ctx_dirty', '_lock',
+    )
+    
+    # Free list of recycled sessions (see SessionManager.create_session / recycle_session)
+    _pool = deque(maxlen=256)
+    
     def __init__(self, call_sid, call_direction="inbound", lead_data=None):
+        # Containers are created once per object and refilled in place when the object is reused
+        self.session_memory = {}
+        self.session_variables = {}
+        self.conversation_history = deque(maxlen=Config.HISTORY_MAX)  # Most recent entries only
+        self._accumulated_parts = []  # Final transcript segments of the current utterance
+        
+        # Guards multi-field updates (response staging + history)
+        self._lock = threading.Lock()
+        
+        self._init_state(call_sid, call_direction, lead_data)
+    
+    def _init_state(self, call_sid, call_direction="inbound", lead_data=None):
+        """(Re)initialise all per-call state - used by __init__ and when a pooled session is reused"""
         self.call_sid = call_sid
         self.call_direction = call_direction  # "inbound" or "outbound"
-        self.lead_data = lead_data or {}  # School info for outbound calls
+        self.lead_data = lead_data or {}  # CustomerData (or dict) for outbound calls
+        self.start_time = time.monotonic()  # Call duration reference (monotonic - not a wall-clock time)
         
         # Session memory - tracks what has been discussed
-        self.session_memory = Config.SESSION_FLAGS_TEMPLATE.copy()
+        self.session_memory.clear()
+        self.session_memory.update(_FLAG_DEFAULTS)
         
         # Dynamic session variables - tracks specific information gathered during conversation
-        self.session_variables = Config.SESSION_VARIABLES_TEMPLATE.copy()
+        self.session_variables.clear()
+        self.session_variables.update(_VARIABLE_DEFAULTS)
         
         # Conversation tracking
-        self.conversation_history = []
-        self.accumulated_text = ""
+        self.conversation_history.clear()
+        self._history_total = 0  # Entries ever added (history itself is capped at HISTORY_MAX)
+        
+        # Cached get_session_context() result - invalidated by update_session_variable/set_flag
+        self._ctx_cached = ""
+        self._ctx_dirty = True
+        self._accumulated_parts.clear()
         self.last_activity_time = None
         self.silence_threshold = Config.SILENCE_THRESHOLD
         
@@ -34,7 +125,16 @@ class StreamingSession:
         
         # Connection objects
         self.dg_connection = None  # Deepgram WebSocket
+        self.deepgram_future = None  # Pending Deepgram setup on the shared pool
         self.twilio_ws = None      # Twilio WebSocket
+        self.stream_sid = None
+        
+        # Intro chosen by the call webhook (sent when the media stream starts)
+        self.selected_intro = None
+        
+        # Callback URLs (cached when the call's first webhook arrives)
+        self.base_url = None
+        self.ws_url = None
         
         # Response preparation
         self.next_response_type = None
@@ -42,6 +142,10 @@ class StreamingSession:
         self.next_transcript = None
         self.ready_for_twiml = False
     
+    def _reset_for_pool(self):
+        """Drop every per-call reference (sockets, lead data, history) before going back to the pool"""
+        self._init_state(None)
+    
     def on_deepgram_open(self, *args, **kwargs):
         """Handle Deepgram connection opening"""
         # Removed debug print for cleaner logs
@@ -60,12 +164,9 @@ class StreamingSession:
         is_final = result.is_final
         
         if sentence.strip():
-            self.last_activity_time = time.time()
+            self.last_activity_time = time.monotonic()
             if is_final:
-                if self.accumulated_text:
-                    self.accumulated_text += " " + sentence
-                else:
-                    self.accumulated_text = sentence
+                self._accumulated_parts.append(sentence)
     
     def on_deepgram_error(self, *args, **kwargs):
         """Handle Deepgram connection errors"""
@@ -74,38 +175,94 @@ class StreamingSession:
     
     def check_for_completion(self):
         """Check if user has finished speaking based on silence threshold"""
-        if (self.accumulated_text and 
+        if (self._accumulated_parts and 
             self.last_activity_time and 
-            time.time() - self.last_activity_time >= self.silence_threshold and
+            time.monotonic() - self.last_activity_time >= self.silence_threshold and
             not self.is_processing):
             
-            self.completed_transcript = self.accumulated_text
+            self.completed_transcript = " ".join(self._accumulated_parts)
             self.transcript_ready = True
-            self.accumulated_text = ""
+            self._accumulated_parts.clear()
             self.last_activity_time = None
             return True
         return False
     
     def add_to_history(self, speaker, message):
         """Add message to conversation history"""
-        timestamp = time.strftime("%H:%M:%S")
-        self.conversation_history.append(f"[{timestamp}] {speaker}: {message}")
+        self.add_history_entries(((speaker, message),))
+    
+    def add_history_entries(self, entries):
+        """Add several (speaker, message) pairs to history under one lock"""
+        timestamp = _history_timestamp()
+        lines = [f"[{timestamp}] {speaker}: {message}" for speaker, message in entries]
+        with self._lock:
+            self.conversation_history.extend(lines)
+            self._history_total += len(lines)
+    
+    def prepare_next_response(self, response_type, content, transcript, history_entries=()):
+        """
+        Stage the next response and record the turn in a single critical section
+        
+        Args:
+            response_type (str): "AUDIO" or "TTS"
+            content (str): Audio file chain or TTS text
+            transcript (str): User input that produced this response
+            history_entries (iterable): (speaker, message) pairs to append to history
+        """
+        timestamp = _history_timestamp()
+        lines = [f"[{timestamp}] {speaker}: {message}" for speaker, message in history_entries]
+        with self._lock:
+            self.next_response_type = response_type
+            self.next_response_content = content
+            self.next_transcript = transcript
+            self.ready_for_twiml = True
+            self.conversation_history.extend(lines)
+            self._history_total += len(lines)
+    
+    @property
+    def history_total(self):
+        """Number of history entries recorded this call, including ones the capped history has dropped"""
+        return self._history_total
+    
+    def recent_history(self, count):
+        """Last `count` history entries as a list (the history deque doesn't support slicing)"""
+        history = self.conversation_history
+        return list(islice(history, max(len(history) - count, 0), None))
+    
+    def take_next_response(self):
+        """Atomically consume the staged response - (response_type, content, transcript) or None if not ready"""
+        with self._lock:
+            if not self.ready_for_twiml:
+                return None
+            self.ready_for_twiml = False
+            return self.next_response_type, self.next_response_content, self.next_transcript
     
     def update_session_variable(self, variable_name, value):
         """Update a specific session variable"""
         if variable_name in self.session_variables:
             old_value = self.session_variables[variable_name]
             self.session_variables[variable_name] = value
+            self._ctx_dirty = True
             print(f"📝 Updated {variable_name}: {old_value} → {value}")
             return True
         return False
     
+    def set_flag(self, flag, value=True):
+        """Set a session memory flag (use this rather than writing session_memory directly)"""
+        self.session_memory[flag] = value
+        self._ctx_dirty = True
+    
     def get_session_variable(self, variable_name):
         """Get a specific session variable"""
         return self.session_variables.get(variable_name)
     
     def get_session_context(self):
-        """Get current session context for AI prompt"""
+        """Get current session context for AI prompt (rebuilt only after a variable or flag changes)"""
+        if not self._ctx_dirty:
+            return self._ctx_cached
+        
+        # Clear the flag before reading, so an update that lands mid-rebuild marks the result stale again
+        self._ctx_dirty = False
         context = []
         
         # Add dynamic variables with values
@@ -118,34 +275,38 @@ class StreamingSession:
         if active_flags:
             context.append(f"Discussed topics: {', '.join(active_flags)}")
         
-        return " | ".join(context) if context else "No context yet"
+        self._ctx_cached = " | ".join(context) if context else "No context yet"
+        return self._ctx_cached
+    
+    # (session_memory flag, prompt line) pairs for get_formatted_session_context
+    _FLAG_PHRASES = tuple((flag, f"- {phrase}\n") for flag, phrase in (
+        ("intro_played", "Intro already done - DON'T use intro files again"),
+        ("services_explained", "Services already explained"),
+        ("pricing_discussed", "Pricing already discussed"),
+        ("availability_mentioned", "Availability already mentioned"),
+        ("location_confirmed", "Location already confirmed"),
+        ("urgency_assessed", "Urgency already assessed"),
+        ("contact_details_collected", "Contact details already collected"),
+        ("booking_confirmed", "Booking already confirmed"),
+        ("experience_mentioned", "Experience already mentioned"),
+    ))
     
     def get_formatted_session_context(self):
         """Get formatted session context for AI prompts (legacy method)"""
-        context = "\n# SESSION MEMORY:\n"
-        if self.session_memory["intro_played"]:
-            context += "- Intro already done - DON'T use intro files again\n"
-        if self.session_memory["admission_process_explained"]:
-            context += "- Admission process already explained\n"
-        if self.session_memory["features_discussed"]:
-            context += "- Features already discussed\n"
-        if self.session_memory["pricing_mentioned"]:
-            context += "- Pricing already mentioned\n"
-        if self.session_memory["demo_offered"]:
-            context += "- Demo already offered\n"
-        if self.session_memory["meeting_scheduled"]:
-            context += "- Meeting already scheduled\n"
+        memory = self.session_memory
+        parts = ["\n# SESSION MEMORY:\n"]
+        parts.extend(phrase for flag, phrase in self._FLAG_PHRASES if memory.get(flag))
         
         # Add call direction context
         if self.call_direction == "outbound":
-            school_name = self.lead_data.get('school_name', 'parent/guardian')
-            context += f"- OUTBOUND CALL to {school_name}\n"
+            customer_name = self.lead_data.get('customer_name', 'customer')
+            parts.append(f"- OUTBOUND CALL to {customer_name}\n")
         
-        return context
+        return "".join(parts)
     
     def reset_for_next_input(self):
         """Reset session state for next user input"""
-        self.accumulated_text = ""
+        self._accumulated_parts.clear()
         self.last_activity_time = None
         self.is_processing = False
         self.completed_transcript = None
@@ -165,14 +326,29 @@ class StreamingSession:
 class SessionManager:
     """Manages multiple concurrent call sessions"""
     
+    # Sessions are spread over independently locked shards so concurrent call setup/teardown doesn't contend
+    _SHARD_COUNT = 16  # Power of two - shard index is hash(call_sid) & (count - 1)
+    
     def __init__(self):
-        self.active_sessions = {}
+        self._shards = tuple((threading.Lock(), {}) for _ in range(self._SHARD_COUNT))
         self.active_outbound_calls = {}
     
+    def _shard(self, call_sid):
+        """(lock, sessions dict) pair that owns this call SID"""
+        return self._shards[hash(call_sid) & (self._SHARD_COUNT - 1)]
+    
     def create_session(self, call_sid, call_direction="inbound", lead_data=None):
-        """Create new session for incoming call"""
-        session = StreamingSession(call_sid, call_direction, lead_data)
-        self.active_sessions[call_sid] = session
+        """Create new session for incoming call (reusing a pooled session object when one is free)"""
+        try:
+            session = StreamingSession._pool.pop()
+        except IndexError:
+            session = StreamingSession(call_sid, call_direction, lead_data)
+        else:
+            session._init_state(call_sid, call_direction, lead_data)
+        
+        lock, sessions = self._shard(call_sid)
+        with lock:
+            sessions[call_sid] = session
         
         # Only show session creation for debugging if needed
         # direction_emoji = "📞" if call_direction == "inbound" else "🏫"
@@ -182,11 +358,26 @@ class SessionManager:
     
     def get_session(self, call_sid):
         """Get existing session by call SID"""
-        return self.active_sessions.get(call_sid)
+        # A single dict lookup is atomic - reads don't take the shard lock
+        return self._shard(call_sid)[1].get(call_sid)
+    
+    def pop_ready(self, call_sid):
+        """Get a session and consume its staged response in one step - (session, response_type, content, transcript) or None"""
+        session = self.get_session(call_sid)
+        if session is None:
+            return None
+        
+        staged = session.take_next_response()
+        if staged is None:
+            return None
+        
+        return (session,) + staged
     
     def remove_session(self, call_sid):
         """Remove and cleanup session"""
-        session = self.active_sessions.pop(call_sid, None)
+        lock, sessions = self._shard(call_sid)
+        with lock:
+            session = sessions.pop(call_sid, None)
         if session:
             session.cleanup()
             # Removed cleanup log for cleaner output
@@ -194,9 +385,20 @@ class SessionManager:
         # Also remove from outbound tracking if exists
         self.active_outbound_calls.pop(call_sid, None)
     
+    def recycle_session(self, session):
+        """
+        Return a finished session object to the pool for reuse by a later call
+        
+        Only call this once nothing else holds the session (its media stream, transcript
+        checker and Deepgram setup have all finished) - remove_session() only unregisters it.
+        """
+        session.cleanup()  # Never pool a live Deepgram connection - its callbacks are bound to this object
+        session._reset_for_pool()
+        StreamingSession._pool.append(session)
+    
     def get_active_count(self):
         """Get count of active sessions"""
-        return len(self.active_sessions)
+        return sum(len(sessions) for _, sessions in self._shards)
     
     def track_outbound_call(self, call_sid, lead_data):
         """Track outbound call metadata"""
@@ -7,17 +7,81 @@ Exports collected customer session data to CSV/Excel files for client reporting
 import os
 import csv
 import json
+import time
+import queue
+import atexit
+import threading
+from contextlib import ExitStack
 from datetime import datetime
+import orjson
 from config import Config
 
+# Rows are written by a background thread in batches of up to _BATCH_MAX_ROWS, at most _BATCH_WINDOW seconds apart
+_BATCH_MAX_ROWS = 100
+_BATCH_WINDOW = 0.5
+_STOP = object()  # Queue sentinel - flush what's buffered and exit
+
 class SessionDataExporter:
     """Handles exporting session data to CSV files for client reporting"""
     
+    # Folder/header setup runs once per process, however many exporters are created
+    _initialized = False
+    
+    # CSV headers based on plumbing business session variables (also the JSONL field names)
+    _CSV_HEADERS = (
+        "call_sid",
+        "call_date",
+        "call_time",
+        "call_direction",
+        "customer_name",
+        "customer_phone",
+        "customer_location",
+        "service_type",
+        "urgency_level",
+        "property_type",
+        "preferred_date",
+        "preferred_time",
+        "selected_appointment",
+        "issue_description",
+        "previous_customer",
+        "call_duration_seconds",
+        "conversation_summary",
+        "booking_status",
+        "follow_up_required",
+    )
+    
+    # Session variables written to the CSV, in the same column order as ensure_csv_headers()
+    _CSV_VAR_KEYS = (
+        "customer_name",
+        "customer_phone",
+        "customer_location",
+        "service_type",
+        "urgency_level",
+        "property_type",
+        "preferred_date",
+        "preferred_time",
+        "selected_appointment",
+        "issue_description",
+        "previous_customer",
+    )
+    
     def __init__(self):
         self.export_folder = "customer_data"
         self.csv_file = "customer_sessions.csv"
-        self.ensure_export_directory()
-        self.ensure_csv_headers()
+        self.csv_path = os.path.join(self.export_folder, self.csv_file)
+        self.jsonl_path = os.path.join(self.export_folder, "customer_sessions.jsonl")  # Written when Config.JSONL_EXPORT is on
+        self._row_count_cache = None  # ((mtime_ns, size), row_count) from the last get_export_stats scan
+        
+        if not SessionDataExporter._initialized:
+            self.ensure_export_directory()
+            self.ensure_csv_headers()
+            SessionDataExporter._initialized = True
+        
+        # Completed calls only enqueue their row - the CSV is written off the call path
+        self._queue = queue.Queue()
+        self._writer_thread = threading.Thread(target=self._drain, name="session-export", daemon=True)
+        self._writer_thread.start()
+        atexit.register(self.close)
     
     def ensure_export_directory(self):
         """Create export directory if it doesn't exist"""
@@ -27,43 +91,18 @@ class SessionDataExporter:
     
     def ensure_csv_headers(self):
         """Ensure CSV file exists with proper headers"""
-        csv_path = os.path.join(self.export_folder, self.csv_file)
-        
-        # Define CSV headers based on plumbing business session variables
-        headers = [
-            "call_sid",
-            "call_date",
-            "call_time", 
-            "call_direction",
-            "customer_name",
-            "customer_phone",
-            "customer_location",
-            "service_type",
-            "urgency_level",
-            "property_type",
-            "preferred_date",
-            "preferred_time",
-            "selected_appointment",
-            "issue_description",
-            "previous_customer",
-            "call_duration_seconds",
-            "conversation_summary",
-            "booking_status",
-            "follow_up_required"
-        ]
+        csv_path = self.csv_path
         
         # Create CSV with headers if it doesn't exist
         if not os.path.exists(csv_path):
             with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
                 writer = csv.writer(csvfile)
-                writer.writerow(headers)
+                writer.writerow(self._CSV_HEADERS)
             print(f"📊 Created customer data CSV: {csv_path}")
     
     def export_session_data(self, session, call_duration=None):
         """Export session data to CSV file"""
         try:
-            csv_path = os.path.join(self.export_folder, self.csv_file)
-            
             # Extract session variables
             variables = session.session_variables
             
@@ -81,32 +120,21 @@ class SessionDataExporter:
             follow_up_required = self._needs_follow_up(session)
             
             # Prepare row data
+            call_date, call_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S").split(" ")
             row_data = [
                 session.call_sid,
-                datetime.now().strftime("%Y-%m-%d"),  # call_date
-                datetime.now().strftime("%H:%M:%S"),  # call_time
+                call_date,
+                call_time,
                 session.call_direction,  # inbound/outbound
-                variables.get("customer_name", ""),
-                variables.get("customer_phone", ""),
-                variables.get("customer_location", ""),
-                variables.get("service_type", ""),
-                variables.get("urgency_level", ""),
-                variables.get("property_type", ""),
-                variables.get("preferred_date", ""),
-                variables.get("preferred_time", ""),
-                variables.get("selected_appointment", ""),
-                variables.get("issue_description", ""),
-                variables.get("previous_customer", ""),
+                *[variables.get(key, "") for key in self._CSV_VAR_KEYS],
                 call_duration,
                 conversation_summary,
                 booking_status,
                 follow_up_required
             ]
             
-            # Append to CSV file
-            with open(csv_path, 'a', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(row_data)
+            # Hand the row to the writer thread
+            self._queue.put(row_data)
             
             # Log successful export
             customer_info = variables.get("customer_name", "Unknown")
@@ -119,25 +147,65 @@ class SessionDataExporter:
             print(f"❌ Error exporting session data: {e}")
             return False
     
+    def _drain(self):
+        """Writer thread - append queued rows to the CSV (and JSONL sidecar) in batches through open files"""
+        with ExitStack() as files:
+            csvfile = files.enter_context(open(self.csv_path, 'a', newline='', encoding='utf-8'))
+            writer = csv.writer(csvfile)
+            jsonlfile = files.enter_context(open(self.jsonl_path, 'ab')) if Config.JSONL_EXPORT else None
+            
+            stopping = False
+            while not stopping:
+                row = self._queue.get()
+                if row is _STOP:
+                    break
+                
+                # Collect whatever else arrives within the batch window
+                batch = [row]
+                deadline = time.monotonic() + _BATCH_WINDOW
+                while len(batch) < _BATCH_MAX_ROWS:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        row = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if row is _STOP:
+                        stopping = True
+                        break
+                    batch.append(row)
+                
+                try:
+                    writer.writerows(batch)
+                    csvfile.flush()
+                    if jsonlfile is not None:
+                        jsonlfile.write(b"".join(
+                            orjson.dumps(dict(zip(self._CSV_HEADERS, row))) + b"\n" for row in batch
+                        ))
+                        jsonlfile.flush()
+                except Exception as e:
+                    # Never let one bad batch kill the writer - later exports would be silently lost
+                    print(f"❌ Error writing {len(batch)} session rows: {e}")
+    
+    def close(self):
+        """Flush buffered rows and stop the writer thread (registered with atexit)"""
+        if self._writer_thread.is_alive():
+            self._queue.put(_STOP)
+            self._writer_thread.join(timeout=5.0)
+    
     def _calculate_call_duration(self, session):
-        """Calculate call duration from conversation history"""
-        try:
-            # Simple estimation based on conversation length
-            # In a real implementation, you'd track start time
-            conversation_length = len(session.conversation_history)
-            estimated_duration = conversation_length * 10  # ~10 seconds per exchange
-            return max(estimated_duration, 30)  # Minimum 30 seconds
-        except:
-            return 60  # Default 1 minute
+        """Calculate call duration (seconds) from the session's start time"""
+        return max(int(time.monotonic() - session.start_time), 1)
     
     def _generate_conversation_summary(self, session):
         """Generate a brief summary of the conversation"""
         try:
-            if not hasattr(session, 'conversation_history') or not session.conversation_history:
+            # StreamingSession always has a history (possibly empty)
+            if not session.conversation_history:
                 return "No conversation recorded"
             
             # Get key conversation elements
-            history = session.conversation_history
             summary_parts = []
             
             # Check what was discussed
@@ -150,7 +218,7 @@ class SessionDataExporter:
                 summary_parts.append(f"Booked: {variables['selected_appointment']}")
             
             # Add conversation length info
-            summary_parts.append(f"Exchanges: {len(history)}")
+            summary_parts.append(f"Exchanges: {session.history_total}")
             
             return " | ".join(summary_parts) if summary_parts else "Brief conversation"
             
@@ -159,60 +227,59 @@ class SessionDataExporter:
     
     def _determine_booking_status(self, session):
         """Determine if a booking was made"""
-        try:
-            variables = session.session_variables
-            
-            if variables.get("selected_appointment"):
-                if variables.get("customer_name") and variables.get("customer_phone"):
-                    return "Booked - Confirmed"
-                else:
-                    return "Booked - Pending Details"
-            elif variables.get("preferred_date") or variables.get("preferred_time"):
-                return "Interested - No Booking"
-            elif variables.get("urgency_level") == "emergency":
-                return "Emergency - Immediate Service"
+        variables = session.session_variables
+        
+        if variables.get("selected_appointment"):
+            if variables.get("customer_name") and variables.get("customer_phone"):
+                return "Booked - Confirmed"
             else:
-                return "Inquiry Only"
-                
-        except:
-            return "Unknown"
+                return "Booked - Pending Details"
+        elif variables.get("preferred_date") or variables.get("preferred_time"):
+            return "Interested - No Booking"
+        elif variables.get("urgency_level") == "emergency":
+            return "Emergency - Immediate Service"
+        else:
+            return "Inquiry Only"
     
     def _needs_follow_up(self, session):
         """Determine if follow-up is required"""
-        try:
-            variables = session.session_variables
-            
-            # Follow-up needed if:
-            # 1. Booking started but not completed
-            # 2. Emergency without immediate resolution
-            # 3. Customer provided partial contact info
-            
-            if variables.get("selected_appointment") and not variables.get("customer_phone"):
-                return "Yes - Missing Contact Info"
-            elif variables.get("urgency_level") == "emergency":
-                return "Yes - Emergency Service"
-            elif variables.get("service_type") and not variables.get("selected_appointment"):
-                return "Yes - Service Interest"
-            else:
-                return "No"
-                
-        except:
-            return "Unknown"
+        variables = session.session_variables
+        
+        # Follow-up needed if:
+        # 1. Booking started but not completed
+        # 2. Emergency without immediate resolution
+        # 3. Customer provided partial contact info
+        
+        if variables.get("selected_appointment") and not variables.get("customer_phone"):
+            return "Yes - Missing Contact Info"
+        elif variables.get("urgency_level") == "emergency":
+            return "Yes - Emergency Service"
+        elif variables.get("service_type") and not variables.get("selected_appointment"):
+            return "Yes - Service Interest"
+        else:
+            return "No"
     
     def get_export_stats(self):
         """Get statistics about exported data"""
         try:
-            csv_path = os.path.join(self.export_folder, self.csv_file)
+            csv_path = self.csv_path
             
-            if not os.path.exists(csv_path):
+            try:
+                stat = os.stat(csv_path)
+            except FileNotFoundError:
                 return {"total_sessions": 0, "file_size": 0}
             
-            # Count rows (minus header)
-            with open(csv_path, 'r', encoding='utf-8') as csvfile:
-                row_count = sum(1 for row in csv.reader(csvfile)) - 1  # Subtract header
+            # Count rows (minus header) - rescan only when the file changed since the last call
+            cached = self._row_count_cache
+            if cached and cached[0] == (stat.st_mtime_ns, stat.st_size):
+                row_count = cached[1]
+            else:
+                with open(csv_path, 'rb') as csvfile:
+                    row_count = sum(chunk.count(b"\n") for chunk in iter(lambda: csvfile.read(1 << 20), b"")) - 1
+                self._row_count_cache = ((stat.st_mtime_ns, stat.st_size), row_count)
             
             # Get file size
-            file_size = os.path.getsize(csv_path)
+            file_size = stat.st_size
             
             return {
                 "total_sessions": max(0, row_count),
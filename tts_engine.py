@@ -8,12 +8,13 @@ import os
 import time
 from elevenlabs import ElevenLabs, VoiceSettings
 from config import Config
+from providers import eleven_http_client
 
 class TTSEngine:
     """Manages text-to-speech generation using ElevenLabs"""
     
     def __init__(self):
-        self.client = ElevenLabs(api_key=Config.ELEVENLABS_API_KEY)
+        self.client = ElevenLabs(api_key=Config.ELEVENLABS_API_KEY, httpx_client=eleven_http_client)
         self.voice_id = Config.VOICE_ID
         self.temp_folder = Config.TEMP_FOLDER
         
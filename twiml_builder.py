@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+KLARIQO TWIML BUILDER MODULE
+Lightweight TwiML builders reused across webhook requests
+"""
+
+import threading
+from contextlib import contextmanager
+from xml.sax.saxutils import escape, quoteattr
+from flask import Response
+
+class TwiMLBuilder:
+    """Collects TwiML verbs as markup fragments and renders them in a single join"""
+
+    _HEADER = '<?xml version="1.0" encoding="UTF-8"?><Response>'
+    _FOOTER = '</Response>'
+
+    def __init__(self):
+        self._verbs = []
+
+    def play(self, url):
+        """Play an audio file by URL"""
+        self._verbs.append(f"<Play>{escape(url)}</Play>")
+
+    def say(self, text):
+        """Speak text with Twilio's built-in TTS"""
+        self._verbs.append(f"<Say>{escape(text)}</Say>")
+
+    def hangup(self):
+        """End the call"""
+        self._verbs.append("<Hangup />")
+
+    def connect_stream(self, ws_url):
+        """Open a bidirectional Media Stream to our WebSocket handler"""
+        self._verbs.append(f"<Connect><Stream url={quoteattr(ws_url)} /></Connect>")
+
+    def dial(self, number, timeout, caller_id):
+        """Transfer the call to another number"""
+        caller_id_attr = f" callerId={quoteattr(caller_id)}" if caller_id else ""
+        self._verbs.append(
+            f"<Dial{caller_id_attr} timeout=\"{int(timeout)}\">"
+            f"<Number>{escape(number)}</Number></Dial>"
+        )
+
+    def render(self):
+        """Return the complete TwiML document"""
+        return self._HEADER + "".join(self._verbs) + self._FOOTER
+
+    def clear(self):
+        """Drop all verbs so the builder can be reused"""
+        self._verbs.clear()
+
+
+class TwiMLBuilderPool:
+    """Per-thread free list of TwiMLBuilder objects (one Flask request per thread at a time)"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def acquire(self):
+        """Take a clean builder from this thread's free list (or create one)"""
+        free = getattr(self._local, 'free', None)
+        if free is None:
+            free = self._local.free = []
+        return free.pop() if free else TwiMLBuilder()
+
+    def release(self, builder):
+        """Clear a builder and return it to this thread's free list"""
+        builder.clear()
+        self._local.free.append(builder)
+
+    @contextmanager
+    def builder(self):
+        """Borrow a builder for the duration of a with-block"""
+        builder = self.acquire()
+        try:
+            yield builder
+        finally:
+            self.release(builder)
+
+# Global TwiML builder pool instance
+twiml_pool = TwiMLBuilderPool()
+
+# Fixed-shape documents - rendered with a single bytes %-format instead of a builder
+_CONNECT_STREAM_TEMPLATE = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<Response><Connect><Stream url=%s /></Connect></Response>'
+)
+
+def connect_stream_twiml(ws_url):
+    """TwiML bytes that only open a Media Stream (the first response of every AI-handled call)"""
+    return _CONNECT_STREAM_TEMPLATE % quoteattr(ws_url).encode()
+
+def twiml_response(body):
+    """Wrap rendered TwiML (bytes are passed through untouched) as an XML HTTP response"""
+    return Response(body, content_type='application/xml')